@@ -0,0 +1,94 @@
+"""
+Compare the battle log analytics against walking the battle dicts.
+
+    python -m benchmarks.battle_log [battles]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from collections import Counter, defaultdict
+
+from benchmarks import payloads
+from cogs.utils.cr_battles import BattleLog, BattleLogCache
+
+
+def naive(log: list[dict]) -> dict:
+    wins = losses = draws = trophies = 0
+    decks: dict[tuple, list[int]] = defaultdict(lambda: [0, 0])
+    usage: Counter[str] = Counter()
+    matchups: dict[str, list[int]] = defaultdict(lambda: [0, 0])
+
+    for battle in log:
+        player = battle["team"][0]
+        opponent = battle["opponent"][0]
+        won = player.get("crowns", 0) > opponent.get("crowns", 0)
+        if won:
+            wins += 1
+        elif player.get("crowns", 0) < opponent.get("crowns", 0):
+            losses += 1
+        else:
+            draws += 1
+        trophies += player.get("trophyChange") or 0
+
+        deck = tuple(sorted(card["name"] for card in player["cards"]))
+        decks[deck][0] += 1
+        decks[deck][1] += won
+        usage.update(deck)
+        for card in opponent["cards"]:
+            matchups[card["name"]][0] += 1
+            matchups[card["name"]][1] += won
+
+    top = sorted(decks.items(), key=lambda item: -item[1][0])[:3]
+    best = sorted(
+        ((name, won / games) for name, (games, won) in matchups.items() if games >= 3),
+        key=lambda item: -item[1],
+    )[:5]
+    return {
+        "record": (wins, losses, draws),
+        "trophies": trophies,
+        "decks": top,
+        "usage": usage.most_common(8),
+        "best": best,
+    }
+
+
+def vectorized(log: list[dict]):
+    stats = BattleLog(log).analyze()
+    return stats.top_decks(), stats.most_used(), stats.matchups()
+
+
+def best_of(func, *args, repeat: int = 10) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(battles: int) -> None:
+    log = payloads.cr_battle_log(battles)
+    print(f"{battles} battles")
+    print(f"  naive         {best_of(naive, log) * 1000:8.2f} ms")
+    print(f"  parse+analyze {best_of(vectorized, log) * 1000:8.2f} ms")
+
+    parsed = BattleLog(log)
+    analyze = best_of(lambda: analyze_fresh(parsed))
+    print(f"  analyze only  {analyze * 1000:8.2f} ms")
+
+    cache = BattleLogCache()
+    cache.get("2PP", log)
+    cached = best_of(lambda: cache.get("2PP", log).analyze())
+    print(f"  cached        {cached * 1000:8.2f} ms")
+
+
+def analyze_fresh(parsed: BattleLog):
+    # skip the memo on BattleLog.analyze so the array work is timed
+    parsed._stats.clear()
+    return parsed.analyze()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
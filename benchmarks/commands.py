@@ -0,0 +1,216 @@
+"""
+Offline throughput and latency benchmarks of the API command paths.
+
+    python -m benchmarks.commands [--fixtures DIR] [--latency 0.05] [--error-rate 0.01]
+
+Every HTTP client is pointed at a local ReplayServer. Without recorded fixtures
+a synthetic set built from benchmarks.payloads is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from benchmarks import payloads
+from benchmarks.replay import Cassette, ReplayServer, fixture_key
+from cogs.clash_royale import ClashRoyaleHTTPClient
+from cogs.f1 import ErgastHTTPClient
+from cogs.jokes import JokeAPIHTTPClient
+from cogs.trivia import OpenTDBHTTPClient
+from cogs.utils.cr_utils import CardIndex, ClashRoyaleUtils
+from cogs.utils.f1_utils import F1Utils
+from cogs.utils.ratelimit import TokenBucket
+from cogs.utils.session import SessionManager
+from cogs.weather import WeatherAPIHTTPClient
+
+
+def synthetic_cassette() -> Cassette:
+    cassette = Cassette("benchmarks/fixtures")
+
+    def put(host: str, path: str, body, **query):
+        cassette.put(host, fixture_key("GET", path, query), body)
+
+    cr = "api.clashroyale.com"
+    put(cr, "/v1/players/%232PP", payloads.cr_player())
+    put(cr, "/v1/clans/%239GULPJ9L", payloads.cr_clan())
+    put(cr, "/v1/cards", payloads.cr_cards())
+
+    weather = "api.weatherapi.com"
+    put(weather, "/v1/current.json", payloads.weather_current(), q="London", aqi="no")
+    put(weather, "/v1/forecast.json", payloads.weather_forecast(), q="London", days="3")
+    put(weather, "/v1/search.json", payloads.weather_search(), q="London")
+    put(weather, "/v1/timezone.json", payloads.weather_current(), q="London")
+    # later requests go by the coordinates learnt from the first response
+    london = "51.52,-0.11"
+    put(weather, "/v1/current.json", payloads.weather_current(), q=london, aqi="no")
+    put(weather, "/v1/forecast.json", payloads.weather_forecast(), q=london, days="3")
+    put(weather, "/v1/timezone.json", payloads.weather_current(), q=london)
+
+    ergast = "ergast.com"
+    put(ergast, "/api/f1/2022/5/results.json", payloads.ergast_results())
+    put(ergast, "/api/f1/2022/5/laps.json", payloads.ergast_laps(), limit="100000000")
+
+    put("v2.jokeapi.dev", "/joke/Any", payloads.joke())
+    put("opentdb.com", "/api.php", payloads.trivia(), amount="1")
+    return cassette
+
+
+class Clients:
+    def __init__(self):
+        self.cr = ClashRoyaleHTTPClient("benchmark", None)
+        self.weather = WeatherAPIHTTPClient("benchmark", None)
+        self.f1 = ErgastHTTPClient(None)
+        self.jokes = JokeAPIHTTPClient(None)
+        self.trivia = OpenTDBHTTPClient(None)
+        # built from the first cards response like the cog does
+        self.card_index: CardIndex | None = None
+
+    def __iter__(self):
+        return iter((self.cr, self.weather, self.f1, self.jokes, self.trivia))
+
+
+async def cr_stats(c: Clients):
+    data = await c.cr.player_request("2PP")
+    await ClashRoyaleUtils.build_player_embed(data)
+
+
+async def cr_clan(c: Clients):
+    data = await c.cr.clan_tag_request("9GULPJ9L")
+    await ClashRoyaleUtils.build_clan_embed(data)
+
+
+async def cr_card(c: Clients):
+    if c.card_index is None:
+        c.card_index = CardIndex(await c.cr.cards_request())
+    card = c.card_index.search("Card50")
+    await ClashRoyaleUtils.build_card_embed(card)
+
+
+async def weather_current(c: Clients):
+    await c.weather.current("London")
+
+
+async def weather_forecast(c: Clients):
+    await c.weather.forecast("London", 3)
+
+
+async def f1_results(c: Clients):
+    data = await c.f1.race_results(2022, 5)
+    await F1Utils.build_race_result_main_embed(data)
+    await F1Utils.build_driver_results_embed(data)
+    await c.f1.lap_times(2022, 5)
+
+
+async def joke(c: Clients):
+    await c.jokes.get_joke()
+
+
+async def trivia(c: Clients):
+    await c.trivia.trivia()
+
+
+PATHS: dict[str, Callable[[Clients], Awaitable[None]]] = {
+    "cr stats": cr_stats,
+    "cr clan": cr_clan,
+    "cr card": cr_card,
+    "weather current": weather_current,
+    "weather forecast": weather_forecast,
+    "f1 results": f1_results,
+    "joke": joke,
+    "trivia": trivia,
+}
+
+
+async def run_path(
+    func: Callable[[Clients], Awaitable[None]],
+    clients: Clients,
+    requests: int,
+    concurrency: int,
+) -> tuple[float, list[float], int]:
+    latencies: list[float] = []
+    failures = 0
+    queue = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+        for _ in queue:
+            start = time.perf_counter()
+            try:
+                await func(clients)
+            except Exception:
+                failures += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, latencies, failures
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    index = min(int(len(values) * pct / 100), len(values) - 1)
+    return values[index]
+
+
+async def main(args: argparse.Namespace) -> None:
+    if args.fixtures:
+        cassette = Cassette.load(args.fixtures)
+    else:
+        cassette = synthetic_cassette()
+
+    server = ReplayServer(
+        cassette,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=0,
+    )
+    sessions = SessionManager()
+    clients = Clients()
+
+    async with server:
+        for client in clients:
+            server.point(client)
+            if not args.limits:
+                client.limiter = TokenBucket(None, 1)
+            if not args.cache:
+                client.cache.max_bytes = 0
+            await client.create(sessions)
+
+        print(
+            f"{'path':<18}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}"
+            f"{'p99 ms':>10}{'failed':>8}"
+        )
+        for name, func in PATHS.items():
+            elapsed, latencies, failures = await run_path(
+                func, clients, args.requests, args.concurrency
+            )
+            print(
+                f"{name:<18}{len(latencies) / elapsed:>10.1f}"
+                f"{percentile(latencies, 50) * 1000:>10.2f}"
+                f"{percentile(latencies, 95) * 1000:>10.2f}"
+                f"{percentile(latencies, 99) * 1000:>10.2f}"
+                f"{failures:>8}"
+            )
+
+        for client in clients:
+            await client.close()
+        await sessions.close()
+
+    print(f"\nreplay server: {server.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", help="directory of recorded fixtures")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="keep response caching")
+    parser.add_argument("--limits", action="store_true", help="keep rate limits")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,104 @@
+"""
+Startup time of loading guild settings, one SELECT per guild against one in total.
+
+    python -m benchmarks.hydration [guilds]
+
+Builds throwaway units and joke blacklist tables with that many synthetic guilds.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import aiosqlite
+
+from cogs.jokes import Jokes, decode_sql_bool
+from cogs.utils.hydrate import SettingsMap
+from cogs.weather import UnitStore
+
+OPTIONS = tuple(Jokes.default_options)
+
+
+async def build(db: aiosqlite.Connection, guilds: int) -> list[int]:
+    rng = random.Random(0)
+    ids = rng.sample(range(10**17, 10**18), guilds)
+    await db.execute(
+        "CREATE TABLE units (id INTEGER PRIMARY KEY, temp TEXT, speed TEXT)"
+    )
+    await db.execute(
+        f"CREATE TABLE blacklist (id INTEGER PRIMARY KEY, "
+        f"{', '.join(f'{option} BOOLEAN' for option in OPTIONS)})"
+    )
+    await db.executemany(
+        "INSERT INTO units VALUES (?, ?, ?)",
+        [(i, rng.choice("CF"), rng.choice(("kph", "mph"))) for i in ids],
+    )
+    await db.executemany(
+        f"INSERT INTO blacklist VALUES (?{', ?' * len(OPTIONS)})",
+        [(i, *(rng.random() < 0.5 for _ in OPTIONS)) for i in ids],
+    )
+    await db.commit()
+    return ids
+
+
+async def per_guild(db: aiosqlite.Connection, ids: list[int]) -> tuple[dict, dict]:
+    """How the cogs loaded their settings before."""
+    units, blacklist = {}, {}
+    for guild_id in ids:
+        async with db.execute(
+            "SELECT temp, speed FROM units WHERE id = ?", (guild_id,)
+        ) as cursor:
+            data = await cursor.fetchone()
+        if data is not None:
+            units[guild_id] = data
+    for guild_id in ids:
+        async with db.execute(
+            f"SELECT {', '.join(OPTIONS)} FROM blacklist WHERE id = ?", (guild_id,)
+        ) as cursor:
+            data = await cursor.fetchone()
+        blacklist[guild_id] = dict(zip(OPTIONS, decode_sql_bool(data)))
+    return units, blacklist
+
+
+async def bulk(db: aiosqlite.Connection, ids: list[int]) -> tuple[dict, dict]:
+    store = UnitStore()
+    store.db = db
+    await store.load(ids)
+
+    blacklist = SettingsMap()
+    await blacklist.load(
+        db,
+        f"SELECT id, {', '.join(OPTIONS)} FROM blacklist",
+        convert=lambda *row: dict(zip(OPTIONS, decode_sql_bool(row))),
+        only=ids,
+    )
+    units = {i: (store.temp[i], store.speed[i]) for i in store.temp}
+    return units, blacklist
+
+
+async def main(guilds: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        db = await aiosqlite.connect(Path(directory) / "settings.db")
+        ids = await build(db, guilds)
+
+        results = []
+        for name, load in (("per guild", per_guild), ("one select", bulk)):
+            start = time.perf_counter()
+            result = await load(db, ids)
+            elapsed = time.perf_counter() - start
+            results.append(result)
+            print(f"{name:<12}{elapsed * 1000:>10.1f} ms")
+
+        assert results[0] == results[1]
+        await db.close()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    print(f"{count} guilds")
+    asyncio.run(main(count))
@@ -0,0 +1,89 @@
+"""
+Compare the JSON decode paths used by AsyncHTTPClient.
+
+    python -m benchmarks.json_decode [recorded.json ...]
+
+Without arguments synthetic Ergast lap and Clash Royale clan payloads are used.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+from benchmarks import payloads
+from cogs.utils import fastjson
+
+
+def best_of(func, body: bytes, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(body)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def loop_stall(body: bytes, threshold: int) -> tuple[float, float]:
+    """Returns the total decode time and the longest the loop was blocked."""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await fastjson.decode(body, threshold=threshold)
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, stall
+
+
+def main(paths: list[str]) -> None:
+    bodies: dict[str, bytes] = {}
+    if paths:
+        for path in paths:
+            bodies[Path(path).name] = Path(path).read_bytes()
+    else:
+        bodies["ergast laps 20x70"] = payloads.dumps(payloads.ergast_laps())
+        bodies["ergast laps 20x70 x10"] = payloads.dumps(
+            [payloads.ergast_laps(seed=i) for i in range(10)]
+        )
+        bodies["clash royale clan"] = payloads.dumps(payloads.cr_clan())
+
+    print(f"fast backend: {fastjson.BACKEND}\n")
+    for name, body in bodies.items():
+        print(f"{name} ({len(body) / 1024:.0f} KiB)")
+        print(f"  json.loads      {best_of(json.loads, body) * 1000:8.3f} ms")
+        print(f"  fastjson.loads  {best_of(fastjson.loads, body) * 1000:8.3f} ms")
+
+        asyncio.run(compare_paths(body))
+        print()
+
+
+async def compare_paths(body: bytes) -> None:
+    # start the default executor's thread so it isn't part of the timing
+    await asyncio.to_thread(fastjson.loads, b"{}")
+
+    for label, threshold in (("on loop", len(body) + 1), ("offloaded", 0)):
+        elapsed, stall = await loop_stall(body, threshold)
+        print(
+            f"  decode {label:<9} {elapsed * 1000:8.3f} ms"
+            f"  (loop blocked {stall * 1000:.3f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,104 @@
+"""
+Compare the lap time matrix against walking the laps once per driver.
+
+    python -m benchmarks.lap_times [drivers] [laps]
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+import numpy as np
+
+from benchmarks import payloads
+from cogs.utils.f1_laps import LapTable
+
+
+def time_to_millis(time: str) -> int:
+    time = time.replace(".", ":")
+    minutes, seconds, millis = time.split(":")
+    return (int(minutes) * 60000) + (int(seconds) * 1000) + int(millis)
+
+
+def process_lap_times(lap_data: list[list[dict]], driver: str) -> list[int]:
+    # what DriverResultsView did for every driver it plotted
+    data = []
+    for lap in lap_data:
+        for d in lap:
+            if d["driverId"] == driver:
+                data.append(d["time"])
+    return [time_to_millis(time) for time in data]
+
+
+def naive(laps: list[dict], drivers: list[str]) -> dict:
+    lap_data = [lap["Timings"] for lap in laps]
+    times = [process_lap_times(lap_data, driver) for driver in drivers]
+    width = len(laps)
+    for row in times:
+        row.extend(0 for _ in range(width - len(row)))
+
+    elapsed = []
+    for row in times:
+        total, running = 0, []
+        for lap in row:
+            total += lap
+            running.append(total)
+        elapsed.append(running)
+    gaps = [
+        [row[i] - min(other[i] for other in elapsed) for i in range(width)]
+        for row in elapsed
+    ]
+    deltas = [[a - b for a, b in zip(row, times[0])] for row in times]
+    return {
+        "times": times,
+        "gaps": gaps,
+        "deltas": deltas,
+        "best": [min(t for t in row if t) for row in times],
+        "average": [sum(row) / len([t for t in row if t]) for row in times],
+    }
+
+
+def vectorized(laps: list[dict], drivers: list[str]) -> dict:
+    table = LapTable(laps)
+    return compare(table, drivers)
+
+
+def compare(table: LapTable, drivers: list[str]) -> dict:
+    return {
+        "times": table.select(drivers),
+        "gaps": table.gap_to_leader(drivers),
+        "deltas": [table.delta(driver, drivers[0]) for driver in drivers],
+        "best": table.best(drivers),
+        "average": table.average(drivers),
+    }
+
+
+def best_of(func, *args, repeat: int = 20) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(drivers: int, laps: int) -> None:
+    data = payloads.ergast_laps(drivers=drivers, laps=laps)
+    race = data["MRData"]["RaceTable"]["Races"][0]["Laps"]
+    ids = payloads.DRIVERS[:drivers]
+
+    table = LapTable(race)
+    expected = naive(race, ids)
+    assert np.array_equal(np.nan_to_num(table.select(ids)), expected["times"])
+    assert np.allclose(table.average(ids), expected["average"])
+
+    print(f"{drivers} drivers x {laps} laps")
+    print(f"  per driver    {best_of(naive, race, ids) * 1000:8.2f} ms")
+    print(f"  matrix        {best_of(vectorized, race, ids) * 1000:8.2f} ms")
+    print(f"  compare only  {best_of(compare, table, ids) * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3]]
+    main(*(args + [20, 70][len(args) :]))
@@ -0,0 +1,413 @@
+"""
+Synthetic payloads shaped like the real API responses.
+Used when there are no recorded payloads to benchmark with.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+DRIVERS = [
+    "max_verstappen",
+    "perez",
+    "norris",
+    "russell",
+    "bottas",
+    "leclerc",
+    "tsunoda",
+    "vettel",
+    "kevin_magnussen",
+    "stroll",
+    "albon",
+    "gasly",
+    "hamilton",
+    "ocon",
+    "zhou",
+    "latifi",
+    "mick_schumacher",
+    "ricciardo",
+    "alonso",
+    "sainz",
+]
+
+ROLES = ["leader", "coLeader", "elder", "member"]
+
+
+def load(path: str | Path) -> dict | list:
+    with open(path, "rb") as f:
+        return json.loads(f.read())
+
+
+def lap_time(rng: random.Random, base: int = 92000) -> str:
+    millis = base + rng.randint(-1500, 4000)
+    minutes, millis = divmod(millis, 60000)
+    seconds, millis = divmod(millis, 1000)
+    return f"{minutes}:{seconds:02}.{millis:03}"
+
+
+def ergast_laps(drivers: int = 20, laps: int = 70, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    names = DRIVERS[:drivers]
+    # a few drivers retire early
+    retire = {
+        d: rng.randint(laps // 3, laps) if rng.random() < 0.15 else laps for d in names
+    }
+
+    lap_list = []
+    for number in range(1, laps + 1):
+        timings = [
+            {"driverId": d, "position": str(pos), "time": lap_time(rng)}
+            for pos, d in enumerate(names, 1)
+            if number <= retire[d]
+        ]
+        lap_list.append({"number": str(number), "Timings": timings})
+
+    return {
+        "MRData": {
+            "xmlns": "http://ergast.com/mrd/1.5",
+            "series": "f1",
+            "limit": "100000000",
+            "offset": "0",
+            "total": str(sum(len(lap["Timings"]) for lap in lap_list)),
+            "RaceTable": {
+                "season": "2022",
+                "round": "5",
+                "Races": [
+                    {
+                        "season": "2022",
+                        "round": "5",
+                        "raceName": "Miami Grand Prix",
+                        "Laps": lap_list,
+                    }
+                ],
+            },
+        }
+    }
+
+
+def cr_member(rng: random.Random, index: int, role: str) -> dict:
+    trophies = 7500 - index * 40 - rng.randint(0, 30)
+    return {
+        "tag": f"#{rng.getrandbits(40):X}",
+        "name": f"Player{index}",
+        "role": role,
+        "lastSeen": "20221018T120000.000Z",
+        "expLevel": rng.randint(10, 14),
+        "trophies": trophies,
+        "arena": {"id": 54000050, "name": "Legendary Arena"},
+        "clanRank": index + 1,
+        "previousClanRank": index + 1,
+        "donations": rng.randint(0, 600),
+        "donationsReceived": rng.randint(0, 600),
+        "clanChestPoints": 0,
+    }
+
+
+def cr_clan(members: int = 50, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    member_list = [
+        cr_member(rng, i, "leader" if i == 3 else rng.choice(ROLES[1:]))
+        for i in range(members)
+    ]
+    return {
+        "tag": "#9GULPJ9L",
+        "name": "Benchmark Clan",
+        "type": "inviteOnly",
+        "description": "A clan made up for benchmarks",
+        "badgeId": 16000000,
+        "clanScore": 70000,
+        "clanWarTrophies": 3000,
+        "location": {"id": 57000249, "name": "United States", "isCountry": True},
+        "requiredTrophies": 6000,
+        "donationsPerWeek": 12000,
+        "clanChestStatus": "inactive",
+        "clanChestLevel": 1,
+        "clanChestMaxLevel": 0,
+        "members": members,
+        "memberList": member_list,
+    }
+
+
+def cr_player(seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    badges = [
+        {"name": "Played1Year", "level": 5, "maxLevel": 6, "progress": 1900},
+        {"name": "TopLeague", "progress": 1},
+    ]
+    badges += [
+        {
+            "name": f"Classic12Wins{i}",
+            "level": rng.randint(1, 8),
+            "progress": rng.randint(1, 500),
+        }
+        for i in range(25)
+    ]
+    badges += [
+        {"name": f"Mastery{i}", "progress": rng.randint(1, 10)} for i in range(40)
+    ]
+    return {
+        "tag": "#2PP",
+        "name": "Benchmark Player",
+        "expLevel": 14,
+        "trophies": 7400,
+        "bestTrophies": 7800,
+        "wins": 12000,
+        "losses": 9000,
+        "battleCount": 25000,
+        "threeCrownWins": 5000,
+        "challengeCardsWon": 30000,
+        "challengeMaxWins": 20,
+        "tournamentCardsWon": 1000,
+        "tournamentBattleCount": 900,
+        "role": "coLeader",
+        "donations": 300,
+        "donationsReceived": 200,
+        "totalDonations": 90000,
+        "warDayWins": 80,
+        "clanCardsCollected": 100000,
+        "clan": {"tag": "#9GULPJ9L", "name": "Benchmark Clan", "badgeId": 16000000},
+        "arena": {"id": 54000050, "name": "Legendary Arena"},
+        "leagueStatistics": {
+            "currentSeason": {"trophies": 7400, "bestTrophies": 7500},
+            "previousSeason": {"id": "2022-09", "trophies": 7300, "bestTrophies": 7600},
+            "bestSeason": {"id": "2021-07", "trophies": 7900},
+        },
+        "badges": badges,
+        "currentDeck": [{"name": f"Card{i}", "level": 14} for i in range(8)],
+        "starPoints": 50000,
+    }
+
+
+def dumps(payload) -> bytes:
+    return json.dumps(payload).encode()
+
+
+def cr_cards(count: int = 110) -> dict:
+    return {
+        "items": [
+            {
+                "name": f"Card{i}",
+                "id": 26000000 + i,
+                "maxLevel": 14,
+                "iconUrls": {"medium": f"https://api-assets.clashroyale.com/{i}.png"},
+            }
+            for i in range(count)
+        ]
+    }
+
+
+def weather_location(name: str = "London") -> dict:
+    return {
+        "name": name,
+        "region": "City of London, Greater London",
+        "country": "United Kingdom",
+        "lat": 51.52,
+        "lon": -0.11,
+        "tz_id": "Europe/London",
+        "localtime_epoch": 1666108800,
+        "localtime": "2022-10-18 17:00",
+    }
+
+
+def weather_current(name: str = "London") -> dict:
+    return {
+        "location": weather_location(name),
+        "current": {
+            "last_updated_epoch": 1666108500,
+            "temp_c": 14.0,
+            "temp_f": 57.2,
+            "condition": {
+                "text": "Partly cloudy",
+                "icon": "//cdn.weatherapi.com/weather/64x64/day/116.png",
+            },
+            "wind_mph": 8.1,
+            "wind_kph": 13.0,
+            "wind_dir": "SW",
+            "feelslike_c": 13.1,
+            "feelslike_f": 55.6,
+            "vis_km": 10.0,
+            "vis_miles": 6.0,
+        },
+    }
+
+
+def weather_forecast(name: str = "London", days: int = 3) -> dict:
+    day = {
+        "maxtemp_c": 16.0,
+        "maxtemp_f": 60.8,
+        "mintemp_c": 9.0,
+        "mintemp_f": 48.2,
+        "maxwind_mph": 11.0,
+        "maxwind_kph": 17.6,
+        "totalprecip_mm": 0.4,
+        "totalprecip_in": 0.02,
+        "avgvis_km": 9.8,
+        "avgvis_miles": 6.0,
+        "daily_chance_of_rain": 40,
+        "daily_chance_of_snow": 0,
+        "condition": {
+            "text": "Patchy rain possible",
+            "icon": "//cdn.weatherapi.com/weather/64x64/day/176.png",
+        },
+    }
+    astro = {
+        "sunrise": "07:29 AM",
+        "sunset": "06:02 PM",
+        "moon_phase": "Last Quarter",
+    }
+    return {
+        **weather_current(name),
+        "forecast": {
+            "forecastday": [
+                {
+                    "date": f"2022-10-{18 + i}",
+                    "date_epoch": 1666051200 + i * 86400,
+                    "day": day,
+                    "astro": astro,
+                    "hour": [],
+                }
+                for i in range(days)
+            ]
+        },
+    }
+
+
+def weather_search(name: str = "London") -> list:
+    return [
+        {"id": 2801268 + i, "url": f"{name.lower()}-{i}", **weather_location(name)}
+        for i in range(5)
+    ]
+
+
+def joke(joke_id: int = 1) -> dict:
+    return {
+        "error": False,
+        "category": "Programming",
+        "type": "twopart",
+        "setup": "Why do programmers prefer dark mode?",
+        "delivery": "Because light attracts bugs.",
+        "flags": {
+            "nsfw": False,
+            "religious": False,
+            "political": False,
+            "racist": False,
+            "sexist": False,
+            "explicit": False,
+        },
+        "id": joke_id,
+        "safe": True,
+        "lang": "en",
+    }
+
+
+def trivia() -> dict:
+    return {
+        "response_code": 0,
+        "results": [
+            {
+                "category": "Science: Computers",
+                "type": "multiple",
+                "difficulty": "easy",
+                "question": "What does CPU stand for?",
+                "correct_answer": "Central Processing Unit",
+                "incorrect_answers": [
+                    "Central Process Unit",
+                    "Computer Personal Unit",
+                    "Central Processor Unit",
+                ],
+            }
+        ],
+    }
+
+
+def ergast_results(drivers: int = 20) -> dict:
+    results = []
+    for pos, driver in enumerate(DRIVERS[:drivers], 1):
+        results.append(
+            {
+                "number": str(pos),
+                "position": str(pos),
+                "points": str(max(26 - pos * 2, 0)),
+                "Driver": {
+                    "driverId": driver,
+                    "code": driver[:3].upper(),
+                    "givenName": driver.split("_")[0].title(),
+                    "familyName": driver.split("_")[-1].title(),
+                },
+                "Constructor": {"constructorId": "ferrari", "name": "Ferrari"},
+                "grid": str(pos),
+                "laps": "57",
+                "status": "Finished",
+                "Time": {"millis": str(5400000 + pos * 1000)},
+                "FastestLap": {"rank": str(pos), "Time": {"time": "1:31.361"}},
+            }
+        )
+    return {
+        "MRData": {
+            "RaceTable": {
+                "Races": [
+                    {
+                        "season": "2022",
+                        "round": "5",
+                        "raceName": "Miami Grand Prix",
+                        "Results": results,
+                    }
+                ]
+            }
+        }
+    }
+
+
+def cr_battle_log(battles: int = 1000, seed: int = 0, cards: int = 100) -> list:
+    rng = random.Random(seed)
+    pool = [{"name": f"Card{i}", "id": 26000000 + i} for i in range(cards)]
+    decks = [rng.sample(pool, 8) for _ in range(6)]
+
+    log = []
+    for i in range(battles):
+        team_crowns = rng.randint(0, 3)
+        opponent_crowns = rng.randint(0, 3)
+        if team_crowns == opponent_crowns == 3:
+            opponent_crowns = 2
+        change = 0
+        if team_crowns > opponent_crowns:
+            change = rng.randint(25, 35)
+        elif team_crowns < opponent_crowns:
+            change = -rng.randint(25, 35)
+
+        minute = 60 * 24 * 30 - i * 5
+        log.append(
+            {
+                "type": "PvP",
+                "battleTime": f"202210{1 + minute // 1440:02}T"
+                f"{minute // 60 % 24:02}{minute % 60:02}00.000Z",
+                "isLadderTournament": False,
+                "arena": {"id": 54000050, "name": "Legendary Arena"},
+                "gameMode": {"id": 72000006, "name": "Ladder"},
+                "team": [
+                    {
+                        "tag": "#2PP",
+                        "name": "Benchmark Player",
+                        "startingTrophies": 7400,
+                        "trophyChange": change,
+                        "crowns": team_crowns,
+                        "cards": [{**card, "level": 14} for card in rng.choice(decks)],
+                    }
+                ],
+                "opponent": [
+                    {
+                        "tag": f"#{rng.getrandbits(40):X}",
+                        "name": f"Opponent{i}",
+                        "startingTrophies": 7400,
+                        "trophyChange": -change,
+                        "crowns": opponent_crowns,
+                        "cards": [
+                            {**card, "level": 14} for card in rng.sample(pool, 8)
+                        ],
+                    }
+                ],
+            }
+        )
+    return log
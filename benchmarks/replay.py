@@ -0,0 +1,207 @@
+"""
+Record and replay upstream API responses so the cogs can be benchmarked offline.
+
+Record real responses by attaching a Cassette to a client:
+
+    cassette = Cassette("benchmarks/fixtures")
+    client.recorder = cassette
+    ...
+    cassette.save()
+
+Then replay them from a local server:
+
+    server = ReplayServer(Cassette.load("benchmarks/fixtures"), latency=0.05)
+    await server.start()
+    server.point(client)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from aiohttp import web
+
+# query params that are secrets and are never written to a fixture
+SECRET_PARAMS = {"key"}
+
+
+def fixture_key(method: str, raw_path: str, query) -> str:
+    params = sorted((k, v) for k, v in query.items() if k not in SECRET_PARAMS)
+    query_string = "&".join(f"{k}={v}" for k, v in params)
+    return f"{method.upper()} {raw_path}?{query_string}"
+
+
+class Cassette:
+    """Recorded responses grouped by host."""
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.hosts: dict[str, dict[str, dict]] = {}
+
+    @classmethod
+    def load(cls, directory: str | Path) -> Cassette:
+        self = cls(directory)
+        for path in self.directory.glob("*.json"):
+            with open(path, encoding="utf-8") as f:
+                self.hosts[path.stem] = json.load(f)
+        return self
+
+    def save(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for host, fixtures in self.hosts.items():
+            with open(self.directory / f"{host}.json", "w", encoding="utf-8") as f:
+                json.dump(fixtures, f, indent=1)
+
+    def put(
+        self,
+        host: str,
+        key: str,
+        body: bytes | str | dict | list,
+        *,
+        status: int = 200,
+        content_type: str = "application/json",
+        headers: dict[str, str] | None = None,
+    ) -> None:
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        elif isinstance(body, bytes):
+            body = body.decode("utf-8", errors="replace")
+
+        self.hosts.setdefault(host, {})[key] = {
+            "status": status,
+            "content_type": content_type,
+            "headers": headers or {},
+            "body": body,
+        }
+
+    def get(self, host: str, key: str) -> dict | None:
+        return self.hosts.get(host, {}).get(key)
+
+    def add(self, method: str, resp, body: bytes) -> None:
+        """Recorder hook called by AsyncHTTPClient after every response."""
+        url = resp.url
+        headers = {
+            name: resp.headers[name]
+            for name in ("ETag", "Last-Modified")
+            if name in resp.headers
+        }
+        self.put(
+            url.host,
+            fixture_key(method, url.raw_path, url.query),
+            body,
+            status=resp.status,
+            content_type=resp.content_type,
+            headers=headers,
+        )
+
+
+class ReplayServer:
+    """
+    A local aiohttp server that answers with recorded responses.
+    Requests look like ``/<original host>/<original path>``.
+
+    ``latency`` seconds are added to every response, plus up to ``jitter`` more.
+    ``error_rate`` of the responses are replaced with ``error_status``.
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0,
+        jitter: float = 0,
+        error_rate: float = 0,
+        error_status: int = 503,
+        seed: int | None = None,
+    ):
+        self.cassette = cassette
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+
+        self.requests = 0
+        self.misses = 0
+        self.errors = 0
+
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route("*", "/{host}/{path:.*}", self.handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+
+        # port 0 picks a free port
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> ReplayServer:
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        await self.close()
+
+    def point(self, client) -> None:
+        """Rebase an AsyncHTTPClient onto this server."""
+        original = urlsplit(client.base)
+        client.rebase(f"{self.url}/{original.netloc}{original.path}")
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"reason": "injected error"}, status=self.error_status
+            )
+
+        host = request.match_info["host"]
+        raw_path = request.rel_url.raw_path[len(host) + 1 :]
+        key = fixture_key(request.method, raw_path, request.rel_url.query)
+
+        fixture = self.cassette.get(host, key)
+        if fixture is None:
+            self.misses += 1
+            return web.json_response(
+                {"reason": "notFound", "message": f"no fixture for {key}"}, status=404
+            )
+
+        etag = fixture["headers"].get("ETag")
+        if etag is not None and request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers=fixture["headers"])
+
+        return web.Response(
+            status=fixture["status"],
+            text=fixture["body"],
+            content_type=fixture["content_type"],
+            headers=fixture["headers"],
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {"requests": self.requests, "misses": self.misses, "errors": self.errors}
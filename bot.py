@@ -14,6 +14,7 @@ from time import perf_counter
 from typing import Iterable, Any
 import logging
 import asyncio
+import multiprocessing
 import traceback
 import sys
 import warnings
@@ -22,6 +23,9 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from cogs.utils.app_and_cogs import Cog, NoPrivateMessage
+from cogs.utils.session import SessionManager
+from cogs.utils.breaker import ServiceUnavailable
+from cogs.utils.metrics import MetricsServer
 
 warnings.filterwarnings("ignore", category=UserWarning, module="fuzzywuzzy")
 from fuzzywuzzy import fuzz
@@ -49,8 +53,11 @@ class MasterBot(commands.Bot):
         /,
         *,
         token: str,
+        metrics_port: int | None = None,
         **options,
     ) -> None:
+        ensure_main_process()
+
         import monkeypatches
 
         intents = discord.Intents.default()
@@ -85,15 +92,32 @@ class MasterBot(commands.Bot):
 
         self.locks: dict[Cog, asyncio.Lock] = {}
 
+        # one connection pool shared by every cog
+        self.sessions = SessionManager()
+
+        # upstream API metrics for prometheus, only listens on localhost
+        # off unless a port is given, bots run together in one process can't share it
+        self.metrics_server = (
+            MetricsServer(port=metrics_port) if metrics_port is not None else None
+        )
+
     @classmethod
     def default(
-        cls, cr_api_key: str, weather_api_key: str, mongo_db: str, /, *, token: str
+        cls,
+        cr_api_key: str,
+        weather_api_key: str,
+        mongo_db: str,
+        /,
+        *,
+        token: str,
+        metrics_port: int | None = None,
     ) -> MasterBot:
         """The default options"""
         return cls(
             cr_api_key,
             weather_api_key,
             mongo_db,
+            metrics_port=metrics_port,
             command_prefix=commands.when_mentioned_or("!"),
             activity=discord.Game(f"version {cls.__version__}"),
             strip_after_prefix=True,
@@ -133,6 +157,17 @@ class MasterBot(commands.Bot):
         )
 
     async def setup_hook(self) -> None:
+        if self.metrics_server is not None:
+            try:
+                await self.metrics_server.start()
+            except OSError as exc:
+                # metrics are optional, a taken port shouldn't stop the bot
+                logging.getLogger(__name__).error(
+                    f"Metrics server couldn't listen on port "
+                    f"{self.metrics_server.port}",
+                    exc_info=exc,
+                )
+                self.metrics_server = None
         self.loop.create_task(self.sync_once())
         await self.load_extensions()
 
@@ -160,11 +195,30 @@ class MasterBot(commands.Bot):
             if fuzz.ratio(context.message.content, cmd) > ratio
         ]
 
+    async def send_degraded(
+        self, context: commands.Context, error: ServiceUnavailable
+    ) -> None:
+        # cogs forward errors here as well so only answer once
+        if error.reported:
+            return
+        error.reported = True
+
+        embed = discord.Embed(
+            title="Service degraded",
+            description=f"`{error.host}` is having problems right now. "
+            f"Try again in {round(error.retry_after)} seconds.",
+        )
+        await context.send(embed=embed)
+
     async def on_command_error(
         self,
         context: commands.Context,
         exception: commands.errors.CommandError | app_commands.AppCommandError,
     ) -> None:
+        original = getattr(exception, "original", None)
+        if isinstance(original, ServiceUnavailable):
+            await self.send_degraded(context, original)
+            return
         if isinstance(exception, commands.CommandNotFound):
             possibles = self.possible_commands(context)
             if len(possibles) > 0:
@@ -217,12 +271,37 @@ class MasterBot(commands.Bot):
             self.user.id, permissions=permissions, scopes=scopes
         )
 
+    async def close(self) -> None:
+        await super().close()
+        await self.sessions.close()
+        if self.metrics_server is not None:
+            await self.metrics_server.close()
+
     async def start(self, token: str = None, *, reconnect: bool = True) -> None:
         token = token or self.token
         await super().start(token, reconnect=reconnect)
 
 
+def ensure_main_process() -> None:
+    """
+    The chart renderer's workers are spawned, and spawning imports the
+    launcher again as ``__mp_main__``. A launcher without an
+    ``if __name__ == "__main__":`` guard would start a bot in every worker.
+    """
+    if multiprocessing.parent_process() is not None:
+        raise RuntimeError(
+            "MasterBot was started in a worker process. Put the code that "
+            "creates and runs the bots under if __name__ == '__main__':"
+        )
+
+
 def run_many(*instances: MasterBot):
+    """
+    Run every bot in this process until they close.
+    Call it from under ``if __name__ == "__main__":``, see ensure_main_process.
+    """
+    ensure_main_process()
+
     async def runner():
         loop = asyncio.get_event_loop()
         _log = logging.getLogger(__name__)
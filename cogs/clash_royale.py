@@ -1,15 +1,18 @@
-from functools import lru_cache
+import asyncio
 from typing import Optional
 from requests.structures import CaseInsensitiveDict
 
 import discord
 from discord import app_commands
-from discord.ext import commands
+from discord.ext import commands, tasks
 
-from cogs.utils.http import AsyncHTTPClient
-from cogs.utils.cr_utils import ClashRoyaleUtils
+from cogs.utils.http import AsyncHTTPClient, ServiceUnavailable
+from cogs.utils.cr_utils import ClashRoyaleUtils, CardIndex, LOCATIONS
+from cogs.utils.cr_store import PlayerSnapshotStore
+from cogs.utils.cr_battles import BattleLogCache
+from cogs.utils.cr_roster import RosterTracker
 from bot import MasterBot
-from static_embeds import cr_locations_embed, locations
+from static_embeds import cr_locations_embed
 from cogs.utils.app_and_cogs import Cog, QuickObject
 
 
@@ -22,6 +25,17 @@ class CountryError(Exception):
 
 
 class ClashRoyaleHTTPClient(AsyncHTTPClient):
+    cache_ttls = {
+        "players/*/battlelog": 60,
+        "players/*": 2 * 60,
+        "clans/*": 2 * 60,
+        "clans": 5 * 60,
+    }
+    rate_limit = 10
+    rate_burst = 10
+    # clan details fetched at once by poll_rosters
+    fanout_limit = 4
+
     def __init__(self, api_key, loop):
         self.api_key = api_key
         headers = CaseInsensitiveDict()
@@ -42,25 +56,37 @@ class ClashRoyaleHTTPClient(AsyncHTTPClient):
         """
         return await self.request(f"players/%23{tag}/battlelog")
 
-    @lru_cache(maxsize=110)
-    async def cards_request(self, **params) -> list:
+    async def cards_request(self, **params) -> list | None:
         """
+        Not cached, the cog keeps the cards in its CardIndex and refreshes it.
+
         :param params: limit, before, after
-        :return: list
+        :return: list, None if the API answered with an error
         """
         resp = await self.request("cards", **params)
         return resp.get("items")
 
-    async def clans_request(self, limit=5, **params) -> list:
+    @staticmethod
+    def normalize_clan_query(params: dict) -> dict:
+        params = {k: v for k, v in params.items() if v}
+        if isinstance(params.get("name"), str):
+            params["name"] = " ".join(params["name"].split())
+        # the API defaults, leaving them in would give the same search another key
+        if params.get("maxMembers") == 50:
+            del params["maxMembers"]
+        return params
+
+    async def search_clans(self, limit=10, **params) -> list | None:
         """
         :param limit: the amount of clans to return
-        :param params:
-        :return: list
+        :param params: name, locationId, minMembers, maxMembers, minScore
+        :return: list of clan summaries, cached by the normalized query
         """
-        copy = {k: v for k, v in params.items() if v}
-        resp = await self.request("clans", **copy, limit=limit)
-        clans = (clan for clan in resp.get("items"))
-        return [await self.clan_tag_request(clan.get("tag")[1:]) for clan in clans]
+        # normalized so every spelling of a search shares the "clans" cache entry
+        resp = await self.request(
+            "clans", limit=limit, **self.normalize_clan_query(params)
+        )
+        return resp.get("items")
 
     async def clan_tag_request(self, tag):
         return await self.request(f"clans/%23{tag}")
@@ -80,11 +106,82 @@ class ClashRoyale(Cog, name="clashroyale"):
         super().__init__(bot)
         self.api_key = self.bot.clash_royale
         self.http = ClashRoyaleHTTPClient(self.api_key, loop=self.bot.loop)
+        self.card_index: CardIndex | None = None
+        self.snapshots = PlayerSnapshotStore()
+        self.battle_logs = BattleLogCache()
+        self.rosters = RosterTracker()
         print("Clash Royale cog loaded")
 
+    async def cog_load(self):
+        await super().cog_load()
+        await self.snapshots.connect()
+        await self.rosters.connect()
+        self.refresh_cards.add_exception_type(ServiceUnavailable)
+        self.refresh_cards.start()
+        self.prune_snapshots.start()
+        self.poll_rosters.add_exception_type(ServiceUnavailable)
+        self.poll_rosters.start()
+
+    async def cog_unload(self):
+        await super().cog_unload()
+        self.refresh_cards.cancel()
+        self.prune_snapshots.cancel()
+        self.poll_rosters.cancel()
+        await self.snapshots.close()
+        await self.rosters.close()
+
+    @tasks.loop(hours=24)
+    async def prune_snapshots(self):
+        await self.snapshots.prune()
+
+    @tasks.loop(hours=1)
+    async def refresh_cards(self):
+        # new cards only come out every few weeks
+        cards = await self.http.cards_request()
+        if cards:
+            self.card_index = CardIndex(cards)
+
+    @tasks.loop(minutes=1)
+    async def poll_rosters(self):
+        # every clan is fetched once per poll however many servers follow it
+        semaphore = asyncio.Semaphore(self.http.fanout_limit)
+
+        async def poll(tag: str):
+            try:
+                async with semaphore:
+                    clan = await self.http.clan_tag_request(tag)
+            except ServiceUnavailable:
+                raise
+            except Exception:
+                clan = None
+            if not isinstance(clan, dict) or "memberList" not in clan:
+                self.rosters.failed(tag)
+                return
+
+            diff = await self.rosters.update(tag, clan)
+            if diff is None or not diff.changed:
+                return
+            embed = await ClashRoyaleUtils.build_roster_digest_embed(clan, diff)
+            for channel_id in list(self.rosters.followers.get(tag, ())):
+                channel = self.bot.get_channel(channel_id)
+                if channel is None:
+                    continue
+                try:
+                    await channel.send(embed=embed)
+                except discord.HTTPException:
+                    pass
+
+        await asyncio.gather(*(poll(tag) for tag in self.rosters.due()))
+
+    @poll_rosters.before_loop
+    async def before_poll_rosters(self):
+        await self.bot.wait_until_ready()
+
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
-        if isinstance(error, commands.CommandOnCooldown):
+        if isinstance(getattr(error, "original", None), ServiceUnavailable):
+            await self.bot.send_degraded(ctx, error.original)
+        elif isinstance(error, commands.CommandOnCooldown):
             await ctx.send(f"Try again in {error.retry_after:.2f} seconds.")
         elif isinstance(error, commands.CommandInvokeError) and isinstance(
             error.original, AttributeError
@@ -108,17 +205,71 @@ class ClashRoyale(Cog, name="clashroyale"):
     @app_commands.describe(player_tag="The players tag")
     @commands.cooldown(1, 30, commands.BucketType.user)
     async def stats(self, ctx: commands.Context, *, player_tag: str):
-        await ctx.typing()
         if player_tag.startswith("#"):
             player_tag = player_tag[1:]
 
-        data = await self.http.player_request(player_tag)
+        data = await self.snapshots.fresh(player_tag)
+        if data is None:
+            await ctx.typing()
+            data = await self.http.player_request(player_tag)
+            await self.snapshots.record(data)
+
         embed = await ClashRoyaleUtils.build_player_embed(data)
         await ctx.send(embed=embed)
 
+    @commands.hybrid_command(description="Analyze a player's recent battles.")
+    @app_commands.describe(player_tag="The players tag", last="How many battles")
+    @commands.cooldown(1, 30, commands.BucketType.user)
+    async def battles(
+        self,
+        ctx: commands.Context,
+        player_tag: str,
+        last: commands.Range[int, 1, 1000] = 25,
+    ):
+        await ctx.typing()
+        player_tag = player_tag.lstrip("#").upper()
+
+        log = await self.http.battle_log(player_tag)
+        if not isinstance(log, list) or not log:
+            await ctx.send("I couldn't find any battles for that tag.")
+            return
+
+        stats = self.battle_logs.get(player_tag, log).analyze(last)
+        embed = await ClashRoyaleUtils.build_battle_stats_embed(player_tag, stats)
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(description="See a player's trophies over time.")
+    @app_commands.describe(player_tag="The players tag")
+    async def trophyhistory(self, ctx: commands.Context, *, player_tag: str):
+        history = await self.snapshots.history(player_tag, limit=15)
+        if not history:
+            await ctx.send(
+                f"I haven't seen that player yet. Use `{ctx.clean_prefix}stats` first."
+            )
+            return
+
+        embed = await ClashRoyaleUtils.build_trophy_history_embed(player_tag, history)
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(description="See how a player changed over some days.")
+    @app_commands.describe(player_tag="The players tag", days="How many days back")
+    async def progress(self, ctx: commands.Context, player_tag: str, days: int = 7):
+        since = discord.utils.utcnow().timestamp() - days * 24 * 60 * 60
+        snapshots = await self.snapshots.progress(player_tag, since)
+        if snapshots is None:
+            await ctx.send(
+                f"I haven't seen that player yet. Use `{ctx.clean_prefix}stats` first."
+            )
+            return
+
+        embed = await ClashRoyaleUtils.build_progress_embed(player_tag, *snapshots)
+        await ctx.send(embed=embed)
+
     @stats.error
     async def error(self, ctx, error):
-        if isinstance(error, commands.CommandInvokeError):
+        if isinstance(getattr(error, "original", None), ServiceUnavailable):
+            await self.bot.send_degraded(ctx, error.original)
+        elif isinstance(error, commands.CommandInvokeError):
             await ctx.send("Try giving me a real tag.")
             await self.bot.on_command_error(ctx, error)
         elif isinstance(error, commands.CommandOnCooldown):
@@ -132,13 +283,29 @@ class ClashRoyale(Cog, name="clashroyale"):
     @app_commands.describe(name="The card name")
     @commands.cooldown(1, 30, commands.BucketType.user)
     async def card(self, ctx: commands.Context, *, name: str):
-        await ctx.typing()
-        cards = await self.http.cards_request()
+        if self.card_index is None:
+            await ctx.typing()
+            cards = await self.http.cards_request()
+            if not cards:
+                await ctx.send("I couldn't get the cards right now, try again later.")
+                return
+            self.card_index = CardIndex(cards)
 
-        card = ClashRoyaleUtils.search_for_card(cards, name)
+        card = self.card_index.search(name)
         embed = await ClashRoyaleUtils.build_card_embed(card)
         await ctx.send(embed=embed)
 
+    @card.autocomplete("name")
+    async def card_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        if self.card_index is None:
+            return []
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name in self.card_index.complete(current)
+        ]
+
     @commands.hybrid_command(description="Get clash royale clan stats.")
     @app_commands.describe(clan_tag="The clan tag")
     @commands.cooldown(1, 30, commands.BucketType.user)
@@ -151,20 +318,77 @@ class ClashRoyale(Cog, name="clashroyale"):
         embed = await ClashRoyaleUtils.build_clan_embed(clan)
         await ctx.send(embed=embed)
 
+    @commands.hybrid_group(description="Post clan joins, leaves and role changes.")
+    @commands.guild_only()
+    async def clanwatch(self, ctx: commands.Context):
+        if ctx.invoked_subcommand is None:
+            await ctx.send_help(ctx.command)
+
+    @clanwatch.command(name="follow", description="Follow a clan in a channel.")
+    @app_commands.describe(clan_tag="The clan tag", channel="Where to post changes")
+    @commands.has_permissions(manage_guild=True)
+    async def clanwatch_follow(
+        self,
+        ctx: commands.Context,
+        clan_tag: str,
+        channel: Optional[discord.TextChannel] = None,
+    ):
+        channel = channel or ctx.channel
+        clan_tag = clan_tag.lstrip("#").upper()
+
+        clan = await self.http.clan_tag_request(clan_tag)
+        if "memberList" not in clan:
+            await ctx.send("I couldn't find that clan.")
+            return
+
+        # checked before following, follow only schedules the clan
+        tracked = clan_tag in self.rosters.rosters
+        await self.rosters.follow(ctx.guild.id, channel.id, clan_tag)
+        if not tracked:
+            # the first poll is the baseline so changes are posted from now on,
+            # a clan other servers follow keeps its roster for the poll loop to diff
+            await self.rosters.update(clan_tag, clan)
+        await ctx.send(f"Changes to **{clan.get('name')}** go to {channel.mention}.")
+
+    @clanwatch.command(name="unfollow", description="Stop following a clan.")
+    @app_commands.describe(clan_tag="The clan tag")
+    @commands.has_permissions(manage_guild=True)
+    async def clanwatch_unfollow(self, ctx: commands.Context, clan_tag: str):
+        if await self.rosters.unfollow(ctx.guild.id, clan_tag):
+            await ctx.send("Unfollowed that clan.")
+        else:
+            await ctx.send("This server doesn't follow that clan.")
+
+    @clanwatch.command(name="list", description="The clans this server follows.")
+    async def clanwatch_list(self, ctx: commands.Context):
+        following = await self.rosters.following(ctx.guild.id)
+        if not following:
+            await ctx.send("This server doesn't follow any clans.")
+            return
+
+        embed = discord.Embed(
+            title="Followed Clans",
+            description="\n".join(
+                f"#{tag} in <#{channel}>" for tag, channel in following
+            ),
+        )
+        await ctx.send(embed=embed)
+
     @commands.command(name="searchclan", description="Search up a clan in clash royale")
     @commands.cooldown(1, 30, commands.BucketType.user)
     async def search_clan(self, ctx: commands.Context, *, flags):
         await ctx.typing()
 
         flags = await ClanSearchFlags().convert(ctx, flags)
-        if isinstance(flags.location, str):
-            flags.location = locations.get(flags.location.lower())
+        if flags.location:
+            flags.location = LOCATIONS.resolve(flags.location)
             if flags.location is None:
                 raise CountryError()
-        elif isinstance(flags.location, int):
-            pass
 
-        clans = await self.http.clans_request(
+        # only the tag is needed here, the clan itself is fetched by the clan command
+        # one search covers the first 10 results so paging through them is free
+        clans = await self.http.search_clans(
+            max(flags.result, 10),
             name=flags.name,
             locationId=flags.location,
             minMembers=flags.min,
@@ -190,6 +414,8 @@ class ClashRoyale(Cog, name="clashroyale"):
         ):
             embed = discord.Embed(title="You missed a flag argument dummy.")
             await ctx.send(embed=embed)
+        elif isinstance(getattr(error, "original", None), ServiceUnavailable):
+            await self.bot.send_degraded(ctx, error.original)
         elif isinstance(error, commands.CommandInvokeError):
             if isinstance(error.original, TypeError):
                 await ctx.send("I couldn't find that clan.")
@@ -232,6 +458,15 @@ class ClashRoyale(Cog, name="clashroyale"):
         )
         await self.search_clan(ctx, flags=flags)
 
+    @_search_clan.autocomplete("location")
+    async def location_autocomplete(
+        self, interaction: discord.Interaction, current: str
+    ) -> list[app_commands.Choice[str]]:
+        return [
+            app_commands.Choice(name=name, value=name)
+            for name, _ in LOCATIONS.complete(current)
+        ]
+
 
 async def setup(bot: MasterBot):
     await ClashRoyale.setup(bot)
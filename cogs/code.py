@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections import Counter
 from concurrent.futures import TimeoutError
 from typing import Optional
 import os as __os__
@@ -15,6 +16,8 @@ from discord.ext import commands
 import aiofiles
 
 from cogs.utils.app_and_cogs import Cog
+from cogs.utils import metrics
+from cogs.utils.view import Paginator
 from bot import MasterBot
 
 
@@ -270,6 +273,55 @@ class Code(Cog, name="code"):
         except Exception as exc:
             await ctx.send(f"An Error!?\n```\n{exc}\n```")
 
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def httpstats(self, ctx):
+        """Upstream API latency percentiles per route."""
+        pages = []
+        for name, client_metrics in metrics.clients.items():
+            lines = [f"{'route':<28}{'n':>6}{'p50':>8}{'p95':>8}{'p99':>8}"]
+            for route, histogram in sorted(client_metrics.latency.items()):
+                p50, p95, p99 = (
+                    histogram.percentile(pct) * 1000 for pct in (50, 95, 99)
+                )
+                lines.append(
+                    f"{route[:27]:<28}{histogram.count:>6}"
+                    f"{p50:>8.0f}{p95:>8.0f}{p99:>8.0f}"
+                )
+
+            table = "\n".join(lines)
+            embed = discord.Embed(
+                title=f"{name} (ms)", description=f"```\n{table}\n```"
+            )
+            statuses = Counter()
+            for (_, status), count in client_metrics.statuses.items():
+                statuses[status] += count
+            statuses = ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items()))
+            embed.add_field(name="Statuses", value=statuses or "None")
+            embed.add_field(name="In Flight", value=client_metrics.in_flight)
+
+            client = client_metrics.client
+            if client is not None:
+                embed.add_field(
+                    name="Cache Hit Ratio", value=f"{client.cache.hit_ratio:.0%}"
+                )
+                embed.add_field(name="Circuit", value=client.breaker.state)
+                for attribute in ("geocode", "timezones"):
+                    lookup = getattr(client, attribute, None)
+                    if lookup is None:
+                        continue
+                    stats = lookup.stats().items()
+                    embed.add_field(
+                        name=attribute.capitalize(),
+                        value=", ".join(f"{k}: {v}" for k, v in stats),
+                    )
+            pages.append(embed)
+
+        if not pages:
+            await ctx.send("No requests have been made yet.")
+            return
+        await Paginator(pages).send(ctx)
+
     @commands.group(hidden=True)
     async def git(self, ctx):
         pass
@@ -1,18 +1,100 @@
-from typing import Optional
+import asyncio
+import datetime
+from typing import Awaitable, Callable, Optional
 
 from discord import app_commands
 from discord.ext import commands
 
 from bot import MasterBot
 from cogs.utils.app_and_cogs import Cog
+from cogs.utils.f1_mirror import ErgastMirror, route_key, route_season
 from cogs.utils.f1_utils import F1Utils, DriverResultsView
-from cogs.utils.http import AsyncHTTPClient
+from cogs.utils.http import AsyncHTTPClient, ServiceUnavailable, cleanup_params
+from cogs.utils.plots import PlotRenderer
 from cogs.utils.view import Paginator
 
 
 class ErgastHTTPClient(AsyncHTTPClient):
-    def __init__(self, loop):
+    # past seasons never change and the current one only changes on race weekends
+    cache_ttls = {"*current*": 10 * 60}
+    default_ttl = 60 * 60
+    cache_max_bytes = 16 * 1024 * 1024
+    # ergast allows 4 requests a second
+    rate_limit = 4
+    rate_burst = 4
+
+    # what a backfill mirrors for every round of a season, with its params
+    season_routes = (
+        ("/{year}/{race}/results", {}),
+        ("/{year}/{race}/qualifying", {}),
+        ("/{year}/{race}/laps", {"limit": 100000000}),
+        ("/{year}/{race}/driverStandings", {}),
+        ("/{year}/{race}/constructorStandings", {}),
+    )
+
+    def __init__(self, loop, mirror: ErgastMirror | None = None):
         super().__init__("http://ergast.com/api/f1", loop=loop, suffix=".json")
+        self.mirror = mirror
+
+    @staticmethod
+    def finished(season: int | None) -> bool:
+        return season is not None and season < datetime.date.today().year
+
+    async def request(self, route, json=True, method: str = "GET", **params):
+        season = route_season(route)
+        # the current season and all-time routes still change, so they aren't mirrored
+        mirrored = self.mirror is not None and json and method.upper() == "GET"
+        if not mirrored or not self.finished(season):
+            return await super().request(route, json, method, **params)
+
+        params = cleanup_params(params)
+        data = await self.mirror.get(route, params)
+        if data is None:
+            data = await super().request(route, json, method, **params)
+            if isinstance(data, dict) and "MRData" in data:
+                await self.mirror.put(season, route, params, data)
+        return data
+
+    async def backfill(
+        self,
+        seasons: range,
+        *,
+        concurrency: int = 4,
+        progress: Callable[[int, int, int], Awaitable[None]] | None = None,
+    ) -> int:
+        """
+        Mirror every round of finished ``seasons``.
+        Responses that are already stored are skipped, so a backfill that was
+        stopped picks up where it left off. Returns how many were fetched.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        fetched = 0
+
+        async def fetch(route: str, params: dict) -> None:
+            nonlocal fetched
+            async with semaphore:
+                await self.request(route, **params)
+            fetched += 1
+
+        for year in seasons:
+            if not self.finished(year):
+                continue
+            stored = await self.mirror.stored(year)
+            races = await self.schedule(year)
+            missing = [
+                (route.format(year=year, race=race["round"]), params)
+                for race in races
+                for route, params in self.season_routes
+            ]
+            missing = [
+                (route, params)
+                for route, params in missing
+                if route_key(route, params) not in stored
+            ]
+            await asyncio.gather(*(fetch(route, params) for route, params in missing))
+            if progress is not None:
+                await progress(year, len(missing), fetched)
+        return fetched
 
     async def qualifying_results(self, year, race):
         data: dict = (await self.request(f"/{year}/{race}/qualifying"))["MRData"][
@@ -80,11 +162,24 @@ class Formula1(Cog, name="formula one"):
 
     def __init__(self, bot: MasterBot):
         super().__init__(bot)
-        self.http = ErgastHTTPClient(self.bot.loop)
+        self.mirror = ErgastMirror()
+        self.http = ErgastHTTPClient(self.bot.loop, self.mirror)
+        self.plots = PlotRenderer("f1")
         print("Formula One cog loaded")
 
+    async def cog_load(self):
+        await super().cog_load()
+        await self.mirror.connect()
+
+    async def cog_unload(self):
+        await super().cog_unload()
+        await self.mirror.close()
+        self.plots.close()
+
     async def cog_command_error(self, ctx, error) -> None:
-        if isinstance(error, commands.RangeError):
+        if isinstance(getattr(error, "original", None), ServiceUnavailable):
+            await self.bot.send_degraded(ctx, error.original)
+        elif isinstance(error, commands.RangeError):
             await ctx.send(str(error))
         elif isinstance(error, commands.CommandInvokeError) and isinstance(
             error.original, IndexError
@@ -160,6 +255,26 @@ class Formula1(Cog, name="formula one"):
 
         view.message = await ctx.send(embed=embed, view=view)
 
+    @commands.command(hidden=True)
+    @commands.is_owner()
+    async def f1backfill(self, ctx, start: year_param, end: year_param = None):
+        """Mirror finished seasons locally, run it again to resume."""
+        seasons = range(start, (end or start) + 1)
+        message = await ctx.send(f"Backfilling {start}-{seasons[-1]}...")
+
+        async def progress(year: int, missing: int, fetched: int):
+            await message.edit(
+                content=f"{year}: {missing} responses mirrored, {fetched} in total"
+            )
+
+        fetched = await self.http.backfill(seasons, progress=progress)
+        stats = await self.mirror.stats()
+        await message.edit(
+            content=f"Done, fetched {fetched} responses. The mirror has "
+            f"{stats['responses']} responses over {stats['seasons']} seasons "
+            f"({stats['bytes'] / 1024 / 1024:.1f} MB)."
+        )
+
 
 async def setup(bot: MasterBot):
     await Formula1.setup(bot)
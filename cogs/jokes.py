@@ -8,6 +8,7 @@ import aiosqlite
 from aiosqlite import IntegrityError
 
 from cogs.utils.http import AsyncHTTPClient
+from cogs.utils.hydrate import SettingsMap
 from cogs.utils.view import View
 from bot import MasterBot
 from static_embeds import (
@@ -101,6 +102,12 @@ class BlacklistFlags(commands.FlagConverter):
 
 
 class JokeAPIHTTPClient(AsyncHTTPClient):
+    # 120 requests a minute
+    rate_limit = 2
+    rate_burst = 10
+    # every call is a random joke, callers at the same time can't share one
+    coalesce = False
+
     def __init__(self, loop):
         super().__init__("https://v2.jokeapi.dev/joke/", loop=loop)
 
@@ -135,7 +142,7 @@ class Jokes(Cog, name="jokes"):
     def __init__(self, bot: MasterBot):
         super().__init__(bot)
         self.db = None
-        self.blacklist = {}
+        self.blacklist = SettingsMap(default=lambda: dict(self.default_options))
         self.http = JokeAPIHTTPClient(self.bot.loop)
         self.used_jokes: set = {12345}  # 12345 is so the while loop starts
         print("Jokes cog loaded")
@@ -158,35 +165,26 @@ class Jokes(Cog, name="jokes"):
         else:
             await self.bot.on_command_error(ctx, error)
 
-    @commands.Cog.listener()
-    async def on_guild_join(self, guild):
-        if guild.id not in self.blacklist.keys():
-            self.blacklist[guild.id] = self.default_options
-
     @commands.Cog.listener()
     async def on_guild_remove(self, guild):
         if guild.id in self.blacklist.keys():
             del self.blacklist[guild.id]
 
     async def fetch_blacklist(self):
-        for guild in self.bot.guilds:
-            async with self.db.execute(
-                f"""SELECT nsfw, religious, political, sexist, racist, explicit FROM blacklist
-                                        WHERE id = {guild.id}"""
-            ) as cursor:
-                data = await cursor.fetchone()
-            data = decode_sql_bool(data)
-            converted_dict = {}
-
-            for num, key in enumerate(self.default_options.keys()):
-                converted_dict[key] = data[num]
-            self.blacklist[guild.id] = converted_dict
+        # guilds without a row get the defaults when they're first looked up
+        await self.blacklist.load(
+            self.db,
+            "SELECT id, nsfw, religious, political, sexist, racist, explicit "
+            "FROM blacklist",
+            convert=lambda *row: dict(
+                zip(self.default_options.keys(), decode_sql_bool(row))
+            ),
+            only=(guild.id for guild in self.bot.guilds),
+        )
 
     @tasks.loop(minutes=3)
     async def update_db(self):
         for guild in self.bot.guilds:
-            if guild.id not in self.blacklist:
-                self.blacklist[guild.id] = self.default_options
             try:
                 await self.db.execute(
                     f"""INSERT INTO blacklist VALUES ({guild.id},
@@ -243,7 +241,7 @@ class Jokes(Cog, name="jokes"):
                 )
                 return
 
-        blacklist = self.blacklist.get(ctx.guild.id)
+        blacklist = self.blacklist[ctx.guild.id]
         if blacklist:
             blacklist_flags = [k for k, v in blacklist.items() if not v]
         else:
@@ -299,7 +297,7 @@ class Jokes(Cog, name="jokes"):
                 )
                 return
 
-        blacklist = self.blacklist.get(interaction.guild.id)
+        blacklist = self.blacklist[interaction.guild.id]
         if blacklist:
             blacklist_flags = [k for k, v in blacklist.items() if not v]
         else:
@@ -339,14 +337,8 @@ class Jokes(Cog, name="jokes"):
     async def _blacklist(self, ctx, *, flags: BlacklistFlags):
         for k, v in vars(flags).items():
             if v is None:
-                guild = self.blacklist.get(ctx.guild.id)
-                if guild:
-                    setattr(flags, k, guild.get(k))
-                else:
-                    if k in ("religious", "sexist", "racist"):
-                        setattr(flags, k, False)
-                    else:
-                        setattr(flags, k, True)
+                # indexing gives guilds without a row the defaults
+                setattr(flags, k, self.blacklist[ctx.guild.id].get(k))
             else:
                 new = v.capitalize()
                 if new == "True":
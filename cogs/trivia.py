@@ -12,6 +12,12 @@ from bot import MasterBot
 
 
 class OpenTDBHTTPClient(AsyncHTTPClient):
+    # opentdb only allows one request every 5 seconds per IP
+    rate_limit = 0.2
+    rate_burst = 1
+    # every call is a random question, callers at the same time can't share one
+    coalesce = False
+
     def __init__(self, loop):
         super().__init__("https://opentdb.com/", loop=loop, suffix=".php")
         self.token = None
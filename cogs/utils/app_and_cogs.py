@@ -16,7 +16,7 @@ class Cog(commands.Cog):
 
     async def cog_load(self):
         if hasattr(self, "http"):
-            await self.http.create()
+            await self.http.create(self.bot.sessions)
 
     async def cog_unload(self):
         if hasattr(self, "http"):
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import random
+import time
+from urllib.parse import urlsplit
+
+
+class ServiceUnavailable(Exception):
+    """
+    Raised instead of making a request while a host's circuit is open.
+    """
+
+    def __init__(self, host: str, retry_after: float):
+        self.host = host
+        self.retry_after = retry_after
+        self.reported = False
+        super().__init__(f"{host} is unavailable, retry in {retry_after:.0f} seconds")
+
+
+class CircuitBreaker:
+    """
+    Stops requests to a host after ``failure_threshold`` failures in a row.
+    After ``reset_timeout`` seconds one probe request is let through (half open),
+    it closes the circuit if it works and opens it again if it doesn't.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half open"
+
+    def __init__(
+        self, host: str, *, failure_threshold: int = 5, reset_timeout: float = 30
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = self.CLOSED
+        self._probing = False
+
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == self.OPEN
+            and time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    @property
+    def degraded(self) -> bool:
+        return self.state != self.CLOSED
+
+    @property
+    def retry_after(self) -> float:
+        if self._state == self.CLOSED:
+            return 0.0
+        return max(self.reset_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+    def check(self) -> None:
+        """Raises ServiceUnavailable if a request shouldn't be made right now."""
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+
+        self.rejected += 1
+        raise ServiceUnavailable(self.host, self.retry_after or self.reset_timeout)
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._state = self.CLOSED
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self.trips += 1
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self) -> dict[str, int | float | str]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after, 1),
+        }
+
+
+def backoff(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(
+    url: str, *, failure_threshold: int = 5, reset_timeout: float = 30
+) -> CircuitBreaker:
+    """Get the shared breaker for the host of ``url``."""
+    host = urlsplit(url).netloc or url
+    try:
+        breaker = _breakers[host]
+    except KeyError:
+        breaker = _breakers[host] = CircuitBreaker(
+            host, failure_threshold=failure_threshold, reset_timeout=reset_timeout
+        )
+    return breaker
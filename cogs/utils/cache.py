@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+MISSING: Any = object()
+
+
+class CacheEntry:
+    __slots__ = ("value", "size", "expires", "etag", "last_modified")
+
+    def __init__(
+        self,
+        value: Any,
+        size: int,
+        expires: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def revalidatable(self) -> bool:
+        return self.etag is not None or self.last_modified is not None
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+
+class ResponseCache:
+    """
+    A LRU cache bounded by an approximate memory budget in bytes.
+    Entries expire after their own TTL.
+    Expired entries with an ETag or Last-Modified are kept until evicted
+    so they can be revalidated instead of downloaded again.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self._entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.revalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.fresh
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if not entry.fresh:
+            self.expirations += 1
+            self.misses += 1
+            if not entry.revalidatable:
+                self._remove(key)
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def peek(self, key: Hashable) -> CacheEntry | None:
+        """Get an entry even if it has expired, without touching the stats."""
+        return self._entries.get(key)
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: float,
+        size: int = 1,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        if ttl <= 0 or size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(
+            value, size, time.monotonic() + ttl, etag, last_modified
+        )
+        self.current_bytes += size
+
+        while self.current_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def refresh(self, key: Hashable, ttl: float) -> Any:
+        """The upstream said an entry hasn't changed, keep it for another ``ttl``."""
+        entry = self._entries[key]
+        entry.expires = time.monotonic() + ttl
+        self._entries.move_to_end(key)
+        self.revalidations += 1
+        return entry.value
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "revalidations": self.revalidations,
+            "hit_ratio": round(self.hit_ratio, 3),
+        }
+
+
+def match_ttl(ttls: dict[str, float], route: str, default: float = 0) -> float:
+    """
+    Find the TTL of a route.
+    Patterns are shell style so ``players/*`` matches ``players/%23ABC``.
+    Exact matches win over patterns.
+    """
+    route = route.strip("/")
+    try:
+        return ttls[route]
+    except KeyError:
+        pass
+
+    for pattern, ttl in ttls.items():
+        if fnmatchcase(route, pattern):
+            return ttl
+    return default
+
+
+_kwargs_mark = object()
+
+
+def make_key(args: tuple, kwargs: dict) -> Hashable:
+    key = args
+    if kwargs:
+        key += (_kwargs_mark,) + tuple(sorted(kwargs.items()))
+    return key
+
+
+def async_cache(
+    ttl: float = 5 * 60, maxsize: int = 128
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Memoize a coroutine function's results, unlike ``functools.lru_cache``
+    which would cache the coroutine object itself.
+
+    Arguments and keyword arguments make up the key so ``self`` is part of it for
+    methods. Concurrent calls with the same key share one call instead of all
+    missing the cache at once. Exceptions aren't cached.
+    """
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        # the cache's byte budget doubles as an entry budget with size=1
+        cache = ResponseCache(maxsize)
+        inflight: dict[Hashable, asyncio.Task] = {}
+
+        def done(key: Hashable, task: asyncio.Task) -> None:
+            inflight.pop(key, None)
+            if task.cancelled() or task.exception() is not None:
+                return
+            cache.set(key, task.result(), ttl)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            key = make_key(args, kwargs)
+            value = cache.get(key)
+            if value is not MISSING:
+                return value
+
+            task = inflight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(func(*args, **kwargs))
+                inflight[key] = task
+                task.add_done_callback(functools.partial(done, key))
+            return await asyncio.shield(task)
+
+        wrapper.cache = cache
+        wrapper.cache_clear = cache.clear
+        return wrapper
+
+    return decorator
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+import numpy as np
+
+
+class BattleLog:
+    """
+    A battle log turned into arrays, newest battle first like the API.
+
+    The log is walked once to build the arrays, everything after that
+    is done with array operations over all the battles at once.
+    """
+
+    def __init__(self, log: list[dict]):
+        self.size = len(log)
+        self.card_names: list[str] = []
+        card_index: dict[int, int] = {}
+
+        def index(card: dict) -> int:
+            try:
+                return card_index[card["id"]]
+            except KeyError:
+                card_index[card["id"]] = len(self.card_names)
+                self.card_names.append(card.get("name"))
+                return card_index[card["id"]]
+
+        # plain lists while walking the log, writing numpy scalars one by one is slow
+        team_crowns: list[int] = []
+        opponent_crowns: list[int] = []
+        trophy_change: list[float] = []
+        decks: list[list[int]] = []
+        opponent_cards: list[list[int]] = []
+        nan = float("nan")
+
+        for battle in log:
+            team = battle.get("team") or [{}]
+            opponents = battle.get("opponent") or [{}]
+            player = team[0]
+
+            team_crowns.append(player.get("crowns", 0))
+            opponent_crowns.append(opponents[0].get("crowns", 0))
+            change = player.get("trophyChange")
+            trophy_change.append(nan if change is None else change)
+
+            cards = sorted(index(card) for card in player.get("cards", ())[:8])
+            # -1 pads decks with less than 8 cards
+            decks.append(cards + [-1] * (8 - len(cards)))
+            opponent_cards.append(
+                [
+                    index(card)
+                    for opponent in opponents
+                    for card in opponent.get("cards", ())
+                ]
+            )
+
+        self.vocabulary = len(self.card_names)
+        self.team_crowns = np.array(team_crowns, dtype=np.int8)
+        self.opponent_crowns = np.array(opponent_crowns, dtype=np.int8)
+        self.trophy_change = np.array(trophy_change, dtype=float)
+        self.decks = np.array(decks, dtype=np.int32).reshape(self.size, 8)
+
+        # battles x cards, True if the opponent used the card
+        self.opponent_matrix = np.zeros((self.size, self.vocabulary), dtype=bool)
+        rows = np.repeat(np.arange(self.size), [len(c) for c in opponent_cards])
+        columns = np.fromiter(
+            (card for cards in opponent_cards for card in cards),
+            dtype=np.int32,
+            count=len(rows),
+        )
+        self.opponent_matrix[rows, columns] = True
+
+        self._stats: dict[int | None, BattleStats] = {}
+
+    def analyze(self, last: int | None = None) -> BattleStats:
+        try:
+            return self._stats[last]
+        except KeyError:
+            stats = self._stats[last] = BattleStats(self, last)
+            return stats
+
+
+class BattleStats:
+    def __init__(self, log: BattleLog, last: int | None = None):
+        end = log.size if last is None else min(last, log.size)
+        self.names = log.card_names
+        self.battles = end
+
+        team = log.team_crowns[:end]
+        opponent = log.opponent_crowns[:end]
+        wins = team > opponent
+        losses = team < opponent
+
+        self.wins = int(wins.sum())
+        self.losses = int(losses.sum())
+        self.draws = end - self.wins - self.losses
+        self.win_rate = self.wins / end if end else 0.0
+
+        self.trophy_delta = int(np.nansum(log.trophy_change[:end]))
+
+        decks = log.decks[:end]
+        if end:
+            unique_decks, deck_ids, deck_games = np.unique(
+                decks, axis=0, return_inverse=True, return_counts=True
+            )
+            deck_ids = deck_ids.reshape(-1)
+            deck_wins = np.bincount(deck_ids, weights=wins, minlength=len(unique_decks))
+        else:
+            unique_decks = np.empty((0, 8), dtype=np.int32)
+            deck_games = deck_wins = np.empty(0)
+        self.deck_cards = unique_decks
+        self.deck_games = deck_games
+        self.deck_win_rates = np.divide(
+            deck_wins, deck_games, out=np.zeros(len(deck_games)), where=deck_games > 0
+        )
+
+        used = decks[decks >= 0]
+        self.card_usage = np.bincount(used, minlength=log.vocabulary) / max(end, 1)
+
+        matrix = log.opponent_matrix[:end]
+        self.matchup_games = matrix.sum(axis=0)
+        matchup_wins = wins.astype(np.int32) @ matrix
+        self.matchup_win_rates = np.divide(
+            matchup_wins,
+            self.matchup_games,
+            out=np.zeros(log.vocabulary),
+            where=self.matchup_games > 0,
+        )
+
+    def top_decks(self, amount: int = 3) -> list[tuple[list[str], int, float]]:
+        order = np.lexsort((-self.deck_win_rates, -self.deck_games))[:amount]
+        return [
+            (
+                [self.names[card] for card in self.deck_cards[i] if card >= 0],
+                int(self.deck_games[i]),
+                float(self.deck_win_rates[i]),
+            )
+            for i in order
+        ]
+
+    def most_used(self, amount: int = 8) -> list[tuple[str, float]]:
+        order = np.argsort(-self.card_usage, kind="stable")[:amount]
+        return [
+            (self.names[i], float(self.card_usage[i]))
+            for i in order
+            if self.card_usage[i] > 0
+        ]
+
+    def matchups(
+        self, amount: int = 5, *, min_games: int = 3, best: bool = True
+    ) -> list[tuple[str, int, float]]:
+        eligible = np.flatnonzero(self.matchup_games >= min_games)
+        rates = self.matchup_win_rates[eligible]
+        order = eligible[np.argsort(-rates if best else rates, kind="stable")][:amount]
+        return [
+            (
+                self.names[i],
+                int(self.matchup_games[i]),
+                float(self.matchup_win_rates[i]),
+            )
+            for i in order
+        ]
+
+
+class BattleLogCache:
+    """
+    Parsed battle logs per tag, reused until the newest battle changes.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._logs: OrderedDict[str, tuple[tuple, BattleLog]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def signature(log: list[dict]) -> tuple:
+        if not log:
+            return (0, None)
+        return len(log), log[0].get("battleTime")
+
+    def get(self, tag: str, log: list[dict]) -> BattleLog:
+        signature = self.signature(log)
+        cached = self._logs.get(tag)
+        if cached is not None and cached[0] == signature:
+            self._logs.move_to_end(tag)
+            self.hits += 1
+            return cached[1]
+
+        self.misses += 1
+        parsed = BattleLog(log)
+        self._logs[tag] = (signature, parsed)
+        self._logs.move_to_end(tag)
+        if len(self._logs) > self.maxsize:
+            self._logs.popitem(last=False)
+        return parsed
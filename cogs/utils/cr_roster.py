@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import json
+import time
+import zlib
+from typing import NamedTuple
+
+import aiosqlite
+
+from cogs.utils import fastjson
+from cogs.utils.cr_store import normalize_tag
+
+
+class Member(NamedTuple):
+    name: str
+    role: str
+    donations: int
+    trophies: int
+
+
+# member tag -> the few fields that are diffed
+Roster = dict[str, Member]
+
+ROLE_RANKS = {"member": 0, "elder": 1, "coLeader": 2, "leader": 3}
+
+
+def compact_roster(clan: dict) -> Roster:
+    return {
+        member["tag"]: Member(
+            member.get("name"),
+            member.get("role"),
+            member.get("donations") or 0,
+            member.get("trophies") or 0,
+        )
+        for member in clan.get("memberList") or ()
+    }
+
+
+class RosterDiff:
+    """
+    What changed between two rosters.
+    Membership and role changes are what a digest is posted for,
+    donations move all day and only ride along.
+    """
+
+    def __init__(self, old: Roster, new: Roster):
+        self.joined = [new[tag] for tag in new.keys() - old.keys()]
+        self.left = [old[tag] for tag in old.keys() - new.keys()]
+        self.promoted: list[tuple[Member, Member]] = []
+        self.demoted: list[tuple[Member, Member]] = []
+        self.donations: list[tuple[Member, int]] = []
+
+        for tag in new.keys() & old.keys():
+            before, after = old[tag], new[tag]
+            if before.role != after.role:
+                rank_before = ROLE_RANKS.get(before.role, 0)
+                if ROLE_RANKS.get(after.role, 0) > rank_before:
+                    self.promoted.append((before, after))
+                else:
+                    self.demoted.append((before, after))
+            # donations reset every week, a drop is not a change worth showing
+            if after.donations > before.donations:
+                self.donations.append((after, after.donations - before.donations))
+
+        self.joined.sort(key=lambda m: -m.trophies)
+        self.left.sort(key=lambda m: -m.trophies)
+        self.donations.sort(key=lambda d: -d[1])
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.joined or self.left or self.promoted or self.demoted)
+
+    def __bool__(self) -> bool:
+        return self.changed or bool(self.donations)
+
+
+class ClanSchedule:
+    """
+    Adaptive poll interval for one clan.
+    It drops back to ``minimum`` when the roster changes and doubles
+    up to ``maximum`` every poll that it doesn't.
+    """
+
+    __slots__ = ("interval", "next_poll", "minimum", "maximum")
+
+    def __init__(
+        self,
+        interval: float,
+        next_poll: float,
+        *,
+        minimum: float,
+        maximum: float,
+    ):
+        self.interval = interval
+        self.next_poll = next_poll
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def polled(self, changed: bool, now: float) -> None:
+        if changed:
+            self.interval = self.minimum
+        else:
+            self.interval = min(self.interval * 2, self.maximum)
+        self.next_poll = now + self.interval
+
+
+class RosterTracker:
+    """
+    Followed clans and their last roster in SQLite.
+
+    A clan is polled once no matter how many servers follow it,
+    every follow is a (guild, channel, tag) row.
+    """
+
+    def __init__(
+        self,
+        path: str = "cogs/databases/cr_rosters.db",
+        *,
+        min_interval: float = 5 * 60,
+        max_interval: float = 2 * 60 * 60,
+    ):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.db: aiosqlite.Connection | None = None
+        # tag -> channel ids, kept in memory so a poll doesn't query them
+        self.followers: dict[str, set[int]] = {}
+        self.schedules: dict[str, ClanSchedule] = {}
+        self.rosters: dict[str, Roster] = {}
+
+    async def connect(self) -> None:
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.executescript("""CREATE TABLE IF NOT EXISTS follows (
+                    guild_id INTEGER NOT NULL,
+                    channel_id INTEGER NOT NULL,
+                    tag TEXT NOT NULL,
+                    PRIMARY KEY (guild_id, tag)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS follows_tag ON follows (tag);
+                CREATE TABLE IF NOT EXISTS rosters (
+                    tag TEXT PRIMARY KEY,
+                    polled_at INTEGER NOT NULL,
+                    interval INTEGER NOT NULL,
+                    roster BLOB NOT NULL
+                );""")
+        await self.db.commit()
+
+        async with self.db.execute("SELECT channel_id, tag FROM follows") as cursor:
+            async for channel_id, tag in cursor:
+                self.followers.setdefault(tag, set()).add(channel_id)
+
+        now = time.time()
+        async with self.db.execute(
+            "SELECT tag, polled_at, interval, roster FROM rosters"
+        ) as cursor:
+            async for tag, polled_at, interval, roster in cursor:
+                if tag not in self.followers:
+                    continue
+                self.rosters[tag] = self.load_roster(roster)
+                self.schedules[tag] = self.schedule(
+                    interval, max(polled_at + interval, now)
+                )
+
+        for tag in self.followers.keys() - self.schedules.keys():
+            self.schedules[tag] = self.schedule(self.min_interval, now)
+
+    async def close(self) -> None:
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    def schedule(self, interval: float, next_poll: float) -> ClanSchedule:
+        return ClanSchedule(
+            interval,
+            next_poll,
+            minimum=self.min_interval,
+            maximum=self.max_interval,
+        )
+
+    @staticmethod
+    def dump_roster(roster: Roster) -> bytes:
+        rows = [[tag, *member] for tag, member in roster.items()]
+        return zlib.compress(json.dumps(rows, separators=(",", ":")).encode())
+
+    @staticmethod
+    def load_roster(blob: bytes) -> Roster:
+        return {
+            tag: Member(*member)
+            for tag, *member in fastjson.loads(zlib.decompress(blob))
+        }
+
+    async def follow(self, guild_id: int, channel_id: int, tag: str) -> None:
+        tag = normalize_tag(tag)
+        # a guild follows a clan in one channel, following again moves it
+        async with self.db.execute(
+            "SELECT channel_id FROM follows WHERE guild_id = ? AND tag = ?",
+            (guild_id, tag),
+        ) as cursor:
+            row = await cursor.fetchone()
+        await self.db.execute(
+            """INSERT INTO follows VALUES (?, ?, ?)
+               ON CONFLICT (guild_id, tag)
+               DO UPDATE SET channel_id = excluded.channel_id""",
+            (guild_id, channel_id, tag),
+        )
+        await self.db.commit()
+
+        channels = self.followers.setdefault(tag, set())
+        if row is not None:
+            channels.discard(row[0])
+        channels.add(channel_id)
+        if tag not in self.schedules:
+            self.schedules[tag] = self.schedule(self.min_interval, time.time())
+
+    async def unfollow(self, guild_id: int, tag: str) -> bool:
+        tag = normalize_tag(tag)
+        async with self.db.execute(
+            "SELECT channel_id FROM follows WHERE guild_id = ? AND tag = ?",
+            (guild_id, tag),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return False
+
+        await self.db.execute(
+            "DELETE FROM follows WHERE guild_id = ? AND tag = ?", (guild_id, tag)
+        )
+        channels = self.followers.get(tag, set())
+        channels.discard(row[0])
+        if not channels:
+            # nobody follows it anymore, stop polling it
+            self.followers.pop(tag, None)
+            self.schedules.pop(tag, None)
+            self.rosters.pop(tag, None)
+            await self.db.execute("DELETE FROM rosters WHERE tag = ?", (tag,))
+        await self.db.commit()
+        return True
+
+    async def following(self, guild_id: int) -> list[tuple[str, int]]:
+        async with self.db.execute(
+            "SELECT tag, channel_id FROM follows WHERE guild_id = ? ORDER BY tag",
+            (guild_id,),
+        ) as cursor:
+            return list(await cursor.fetchall())
+
+    def due(self, now: float | None = None) -> list[str]:
+        now = time.time() if now is None else now
+        return [tag for tag, s in self.schedules.items() if s.next_poll <= now]
+
+    async def update(self, tag: str, clan: dict) -> RosterDiff | None:
+        """
+        Store a freshly polled clan and reschedule it.
+        Returns what changed, or None the first time a clan is seen.
+        """
+        now = time.time()
+        roster = compact_roster(clan)
+        previous = self.rosters.get(tag)
+        diff = RosterDiff(previous, roster) if previous is not None else None
+
+        schedule = self.schedules.get(tag)
+        if schedule is None:
+            return diff
+        schedule.polled(diff is not None and diff.changed, now)
+
+        self.rosters[tag] = roster
+        await self.db.execute(
+            """INSERT INTO rosters VALUES (?, ?, ?, ?)
+               ON CONFLICT (tag) DO UPDATE SET polled_at = excluded.polled_at,
+               interval = excluded.interval, roster = excluded.roster""",
+            (tag, int(now), int(schedule.interval), self.dump_roster(roster)),
+        )
+        await self.db.commit()
+        return diff
+
+    def failed(self, tag: str) -> None:
+        """Back a clan off when polling it didn't work, e.g. it was deleted."""
+        schedule = self.schedules.get(tag)
+        if schedule is not None:
+            schedule.polled(False, time.time())
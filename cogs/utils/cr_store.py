@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import time
+import zlib
+
+import aiosqlite
+
+from cogs.utils import fastjson
+
+
+def normalize_tag(tag: str) -> str:
+    return tag.strip().lstrip("#").upper()
+
+
+class PlayerSnapshotStore:
+    """
+    Compact player snapshots in SQLite.
+
+    ``snapshots`` keeps a row of numbers every time a player's stats change,
+    ``latest`` keeps the last full payload so repeat lookups don't hit the API.
+    """
+
+    columns = (
+        "trophies",
+        "best_trophies",
+        "exp_level",
+        "wins",
+        "losses",
+        "battle_count",
+        "three_crown_wins",
+        "total_donations",
+        "war_day_wins",
+    )
+    keys = (
+        "trophies",
+        "bestTrophies",
+        "expLevel",
+        "wins",
+        "losses",
+        "battleCount",
+        "threeCrownWins",
+        "totalDonations",
+        "warDayWins",
+    )
+
+    def __init__(
+        self,
+        path: str = "cogs/databases/cr_players.db",
+        *,
+        freshness: float = 5 * 60,
+        retention: float = 180 * 24 * 60 * 60,
+    ):
+        self.path = path
+        self.freshness = freshness
+        self.retention = retention
+        self.db: aiosqlite.Connection | None = None
+
+    async def connect(self) -> None:
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.executescript(f"""CREATE TABLE IF NOT EXISTS snapshots (
+                    tag TEXT NOT NULL,
+                    taken_at INTEGER NOT NULL,
+                    {", ".join(f"{column} INTEGER" for column in self.columns)},
+                    PRIMARY KEY (tag, taken_at)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS snapshots_taken_at ON snapshots (taken_at);
+                CREATE TABLE IF NOT EXISTS latest (
+                    tag TEXT PRIMARY KEY,
+                    fetched_at INTEGER NOT NULL,
+                    payload BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS latest_fetched_at ON latest (fetched_at);""")
+        await self.db.commit()
+
+    async def close(self) -> None:
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    async def fresh(self, tag: str) -> dict | None:
+        """The player's last payload if it's inside the freshness window."""
+        if self.db is None:
+            return None
+
+        async with self.db.execute(
+            "SELECT payload FROM latest WHERE tag = ? AND fetched_at >= ?",
+            (normalize_tag(tag), int(time.time() - self.freshness)),
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        return fastjson.loads(zlib.decompress(row[0]))
+
+    async def record(self, player: dict) -> None:
+        if self.db is None or not player.get("tag"):
+            return
+
+        tag = normalize_tag(player["tag"])
+        now = int(time.time())
+        values = tuple(player.get(key) for key in self.keys)
+
+        payload = zlib.compress(json.dumps(player, separators=(",", ":")).encode())
+        await self.db.execute(
+            """INSERT INTO latest VALUES (?, ?, ?)
+               ON CONFLICT (tag) DO UPDATE SET
+               fetched_at = excluded.fetched_at, payload = excluded.payload""",
+            (tag, now, payload),
+        )
+
+        # only keep a new snapshot when something changed
+        async with self.db.execute(
+            f"""SELECT {", ".join(self.columns)} FROM snapshots
+                WHERE tag = ? ORDER BY taken_at DESC LIMIT 1""",
+            (tag,),
+        ) as cursor:
+            last = await cursor.fetchone()
+        if last != values:
+            placeholders = ", ".join("?" * (len(values) + 2))
+            await self.db.execute(
+                f"INSERT OR REPLACE INTO snapshots VALUES ({placeholders})",
+                (tag, now, *values),
+            )
+        await self.db.commit()
+
+    async def history(
+        self, tag: str, *, since: float | None = None, limit: int = 25
+    ) -> list[dict]:
+        """Snapshots of a player, oldest first."""
+        if self.db is None:
+            return []
+
+        async with self.db.execute(
+            f"""SELECT taken_at, {", ".join(self.columns)} FROM snapshots
+                WHERE tag = ? AND taken_at >= ?
+                ORDER BY taken_at DESC LIMIT ?""",
+            (normalize_tag(tag), int(since or 0), limit),
+        ) as cursor:
+            rows = await cursor.fetchall()
+
+        names = ("taken_at",) + self.columns
+        return [dict(zip(names, row)) for row in reversed(rows)]
+
+    async def progress(self, tag: str, since: float) -> tuple[dict, dict] | None:
+        """
+        The player's stats as of ``since`` and the latest ones.
+        If there is nothing that old the first snapshot after it is used.
+        """
+        if self.db is None:
+            return None
+
+        tag = normalize_tag(tag)
+        since = int(since)
+        select = f"SELECT taken_at, {', '.join(self.columns)} FROM snapshots"
+        async with self.db.execute(
+            f"{select} WHERE tag = ? AND taken_at <= ? ORDER BY taken_at DESC LIMIT 1",
+            (tag, since),
+        ) as cursor:
+            first = await cursor.fetchone()
+        if first is None:
+            async with self.db.execute(
+                f"{select} WHERE tag = ? AND taken_at > ? ORDER BY taken_at LIMIT 1",
+                (tag, since),
+            ) as cursor:
+                first = await cursor.fetchone()
+        async with self.db.execute(
+            f"{select} WHERE tag = ? ORDER BY taken_at DESC LIMIT 1", (tag,)
+        ) as cursor:
+            last = await cursor.fetchone()
+
+        if first is None or last is None:
+            return None
+        names = ("taken_at",) + self.columns
+        return dict(zip(names, first)), dict(zip(names, last))
+
+    async def prune(self) -> int:
+        """Delete everything older than the retention period."""
+        if self.db is None:
+            return 0
+
+        cutoff = int(time.time() - self.retention)
+        cursor = await self.db.execute(
+            "DELETE FROM snapshots WHERE taken_at < ?", (cutoff,)
+        )
+        deleted = cursor.rowcount
+        await self.db.execute("DELETE FROM latest WHERE fetched_at < ?", (cutoff,))
+        await self.db.commit()
+        return deleted
@@ -1,7 +1,401 @@
+from __future__ import annotations
+
+import functools
 import re
+import unicodedata
+from collections import Counter
+from typing import TYPE_CHECKING
 
 import discord
 
+from cogs.utils.embed_template import EmbedTemplate, Field, fmt, path, prepared
+from static_embeds import location_aliases, location_codes, locations
+
+if TYPE_CHECKING:
+    from cogs.utils.cr_battles import BattleStats
+    from cogs.utils.cr_roster import RosterDiff
+
+
+_not_alnum = re.compile(r"[^0-9a-z ]")
+_number = re.compile(r"(\d+(\.\d+)?)")
+
+ROLES = {
+    "leader": "Leader",
+    "coLeader": "Co-leader",
+    "elder": "Elder",
+    "member": "Member",
+}
+JOIN_TYPES = {"open": "Open", "inviteOnly": "Invite only", "closed": "Closed"}
+ARENA_THUMBNAIL = "https://th.bing.com/th/id/R.dc47e311fb4fb32c139c5a4146e020a8?rik=hu1IfHDubAYwuQ&riu=http%3a%2f%2fvignette4.wikia.nocookie.net%2fclashroyale%2fimages%2fe%2fed%2fLegendary_Arena.png%2frevision%2flatest%3fcb%3d20160218170847&ehk=Y%2bGqOSGsU0zs9IdWUUFM0jhEBL8WKy7D3Ki81xm2Ovc%3d&risl=&pid=ImgRaw&r=0"
+
+
+@functools.lru_cache(maxsize=1024)
+def _badge_name(name: str) -> str:
+    """``Classic12Wins`` -> ``Classic 12 Wins``, there are only so many badges."""
+    return _number.sub(r" \1 ", name)
+
+
+class TagNotFound(AttributeError):
+    """
+    The API answered with an error, e.g. ``{"reason": "notFound"}``.
+    An AttributeError like the builders raised before the templates,
+    the commands' error handlers reply to those.
+    """
+
+    def __init__(self, data: dict):
+        self.reason = data.get("reason")
+        super().__init__(f"no player or clan in the response: {self.reason}")
+
+
+def _found(data: dict) -> dict:
+    if "reason" in data or "tag" not in data:
+        raise TagNotFound(data)
+    return data
+
+
+def _capitalize(text: str | None) -> str:
+    return text[:1].upper() + text[1:] if text else "None"
+
+
+def _prepare_player(player: dict) -> dict:
+    """One pass over the badges for the account age and the badge list."""
+    age = "Unknown"
+    badges = []
+    top_league_removed = False
+    for badge in player.get("badges") or ():
+        name = badge.get("name")
+        if name == "Played1Year" and age == "Unknown":
+            days = badge.get("progress")
+            years, days = divmod(days, 365)
+            months, days = divmod(days, 30)
+            age = f"{years} years {months} months {days} days"
+
+        level = badge.get("level")
+        text = _badge_name(name)
+        if level:
+            text = f"{text} **Level:  {level} **"
+        if text == "TopLeague" and not top_league_removed:
+            top_league_removed = True
+            continue
+        badges.append(text)
+
+    wins, losses = player.get("wins") or 0, player.get("losses") or 0
+    role = player.get("role")
+    return {
+        "age": age,
+        "badges": ", ".join(badges) or "None",
+        "winrate": f"{round(wins / (wins + losses) * 100, 1)}%"
+        if wins + losses
+        else "N/A",
+        "clan": f"{ROLES.get(role) or _capitalize(role)} in" if role else "Clan",
+        "deck": ", ".join(card.get("name") for card in player.get("currentDeck") or ()),
+    }
+
+
+def _clan_link(player: dict, _) -> str:
+    clan = player.get("clan")
+    if not clan:
+        return "None"
+    return f"[{clan.get('name')}](https://royaleapi.com/clan/{clan.get('tag')[1:]})"
+
+
+PLAYER_TEMPLATE = EmbedTemplate(
+    title=fmt("{0} {1}", path("name"), path("tag")),
+    fields=[
+        Field("King Level", path("expLevel")),
+        Field("Current Trophies", path("trophies")),
+        Field(
+            "Season High",
+            path("leagueStatistics", "currentSeason", "bestTrophies", default="N/A"),
+        ),
+        Field(
+            "Previous Season",
+            path("leagueStatistics", "previousSeason", "trophies", default="N/A"),
+        ),
+        Field("Highest Trophies", path("bestTrophies")),
+        Field("Arena", path("arena", "name")),
+        Field("Wins", path("wins")),
+        Field("Losses", path("losses")),
+        Field("Winrate", prepared("winrate")),
+        Field("Total Battle Count", path("battleCount")),
+        Field("Three Crowns", path("threeCrownWins")),
+        Field("Max Challenge Wins", path("challengeMaxWins")),
+        Field("Challenge Cards Won", path("challengeCardsWon")),
+        Field("Total Donations", path("totalDonations")),
+        Field("Star Points", lambda player, _: player.get("starPoints") or "N/A"),
+        Field("CW1 Warday Wins", path("warDayWins")),
+        Field("CW1 Clan Cards Collected", path("clanCardsCollected")),
+        Field(prepared("clan"), _clan_link),
+        Field("Account Age", prepared("age")),
+        Field("Badges", prepared("badges")),
+        Field("Current Deck", prepared("deck")),
+    ],
+    thumbnail=ARENA_THUMBNAIL,
+    prepare=_prepare_player,
+)
+
+
+def _prepare_clan(clan: dict) -> dict:
+    members = clan.get("memberList") or []
+    leader = next((m for m in members if m.get("role") == "leader"), None)
+    return {
+        "leader": "[{0}](https://royaleapi.com/player/{1})".format(
+            leader.get("name"), leader.get("tag")[1:]
+        )
+        if leader
+        else "None",
+        # the member list comes sorted by trophies
+        "range": f"{members[-1].get('trophies')}-{members[0].get('trophies')}"
+        if members
+        else "N/A",
+        "top": "\n".join(f"{m.get('name')} | {m.get('trophies')}" for m in members[:5]),
+    }
+
+
+CLAN_TEMPLATE = EmbedTemplate(
+    title=fmt("{0} {1}", path("name"), path("tag")),
+    fields=[
+        Field("Score", path("clanScore")),
+        Field("Clan War Trophies", path("clanWarTrophies")),
+        Field("Location", path("location", "name")),
+        Field("Required Trophies", path("requiredTrophies")),
+        Field("Donations Per Week", path("donationsPerWeek")),
+        Field("Leader", prepared("leader")),
+        Field("Trophy Range", prepared("range")),
+        Field("Members", fmt("{0}/50", path("members"))),
+        Field(
+            "Join Status",
+            lambda clan, _: JOIN_TYPES.get(clan.get("type"))
+            or _capitalize(clan.get("type")),
+        ),
+        Field("Description", path("description")),
+        (
+            Field("Top Members", prepared("top")),
+            lambda clan, _: (clan.get("members") or 0) >= 5,
+        ),
+    ],
+    thumbnail=fmt("https://www.deckshop.pro/img/badges/{0}.png", path("badgeId")),
+    prepare=_prepare_clan,
+)
+
+
+def normalize_name(name: str) -> str:
+    """``Mini P.E.K.K.A`` -> ``mini pekka``, ``Côte d’Ivoire`` -> ``cote divoire``"""
+    name = unicodedata.normalize("NFKD", name.casefold())
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return " ".join(_not_alnum.sub("", name).split())
+
+
+def trigrams(text: str) -> set[str]:
+    text = f"  {text} "
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """
+    Lookup structures over a list of names.
+
+    - a hash map of normalized names for exact lookups
+    - a prefix trie over every word start for autocomplete
+    - a trigram index for fuzzy matching typos
+
+    Subclasses add their names with ``add`` and map indices back to items.
+    """
+
+    max_choices = 25  # discord's autocomplete limit
+
+    def __init__(self):
+        self.exact: dict[str, int] = {}
+        self.trie: dict = {}
+        self.grams: dict[str, list[int]] = {}
+        # every name (aliases too) is a term, the fuzzy scores are per term
+        self.term_items: list[int] = []
+        self.gram_counts: list[int] = []
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return normalize_name(name)
+
+    def add(self, name: str, index: int) -> None:
+        normalized = self.normalize(name)
+        self.exact.setdefault(normalized, index)
+        self.exact.setdefault(normalized.replace(" ", ""), index)
+
+        words = normalized.split()
+        for start in range(len(words)):
+            self._insert("".join(words[start:]), index)
+
+        term = len(self.term_items)
+        self.term_items.append(index)
+        grams = trigrams(normalized.replace(" ", ""))
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            self.grams.setdefault(gram, []).append(term)
+
+    def _insert(self, key: str, index: int) -> None:
+        node = self.trie
+        for char in key:
+            node = node.setdefault(char, {})
+            # every node keeps the first few items under it so lookups don't walk
+            matches = node.setdefault("", [])
+            if len(matches) < self.max_choices and index not in matches:
+                matches.append(index)
+
+    def lookup(self, name: str) -> int | None:
+        normalized = self.normalize(name)
+        index = self.exact.get(normalized)
+        if index is None:
+            index = self.exact.get(normalized.replace(" ", ""))
+        return index
+
+    def prefixed(self, prefix: str) -> list[int] | None:
+        """Indices under ``prefix``, None if nothing starts with it."""
+        node = self.trie
+        for char in self.normalize(prefix).replace(" ", ""):
+            try:
+                node = node[char]
+            except KeyError:
+                return None
+        return node.get("", [])
+
+    def closest(self, name: str, *, limit: int = 1, cutoff: float = 0.4) -> list[int]:
+        grams = trigrams(self.normalize(name).replace(" ", ""))
+        shared: Counter[int] = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+
+        best: dict[int, float] = {}
+        for term, count in shared.items():
+            # dice coefficient
+            score = 2 * count / (len(grams) + self.gram_counts[term])
+            index = self.term_items[term]
+            if score >= cutoff and score > best.get(index, 0):
+                best[index] = score
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return [index for index, _ in ranked[:limit]]
+
+
+class CardIndex(NameIndex):
+    """The card catalogue, built once per refresh."""
+
+    def __init__(self, cards: list[dict]):
+        super().__init__()
+        self.cards = sorted(cards, key=lambda c: c.get("name"))
+        for index, card in enumerate(self.cards):
+            self.add(card.get("name"), index)
+
+    def __len__(self) -> int:
+        return len(self.cards)
+
+    def get(self, name: str) -> dict | None:
+        index = self.lookup(name)
+        return self.cards[index] if index is not None else None
+
+    def complete(self, prefix: str) -> list[str]:
+        if not self.normalize(prefix):
+            return [card.get("name") for card in self.cards[: self.max_choices]]
+
+        indices = self.prefixed(prefix)
+        if indices is None:
+            return [card.get("name") for card in self.fuzzy(prefix, limit=5)]
+        return [self.cards[index].get("name") for index in indices]
+
+    def fuzzy(self, name: str, *, limit: int = 1, cutoff: float = 0.4) -> list[dict]:
+        return [self.cards[i] for i in self.closest(name, limit=limit, cutoff=cutoff)]
+
+    def search(self, name: str) -> dict:
+        card = self.get(name)
+        if card is not None:
+            return card
+
+        matches = self.fuzzy(name)
+        if matches:
+            return matches[0]
+        raise ValueError("Hey! That's not a real card.")
+
+
+_st = re.compile(r"\bst\b")
+
+
+class LocationIndex(NameIndex):
+    """
+    The clan search locations, built once at import.
+    Resolves IDs, ISO codes, names, common aliases and misspellings.
+    """
+
+    def __init__(
+        self,
+        locations: dict[str, int],
+        codes: dict[str, str],
+        aliases: dict[str, str],
+    ):
+        super().__init__()
+        self.ids: list[int] = list(locations.values())
+        self.names: list[str] = [self.display(name) for name in locations]
+        self.by_id = {location_id: i for i, location_id in enumerate(self.ids)}
+        positions = {name: i for i, name in enumerate(locations)}
+        self.codes = {code.upper(): positions[name] for code, name in codes.items()}
+
+        for name, index in positions.items():
+            self.add(name, index)
+            # "myanmar (burma)" is also "myanmar" and "burma"
+            if "(" in name:
+                outer, _, inner = name.partition("(")
+                self.add(outer, index)
+                self.add(inner.rstrip(")"), index)
+        for alias, name in aliases.items():
+            self.add(alias, positions[name])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @staticmethod
+    def display(name: str) -> str:
+        small = {"and", "of", "da", "the"}
+        return " ".join(
+            word if word in small else word[:1].upper() + word[1:]
+            for word in name.split()
+        )
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        # "St. Vincent & Grenadines" -> "saint vincent and grenadines"
+        return _st.sub("saint", normalize_name(name.replace("&", " and ")))
+
+    def index(self, query: str | int) -> int | None:
+        if isinstance(query, int) or query.strip().isdigit():
+            return self.by_id.get(int(query))
+
+        query = query.strip()
+        if len(query) == 2 and query.upper() in self.codes:
+            return self.codes[query.upper()]
+
+        index = self.lookup(query)
+        if index is not None:
+            return index
+
+        # a prefix only counts when it can't be anything else
+        indices = self.prefixed(query)
+        if indices is not None:
+            return indices[0] if len(indices) == 1 else None
+
+        matches = self.closest(query, cutoff=0.5)
+        return matches[0] if matches else None
+
+    def resolve(self, query: str | int) -> int | None:
+        """The location ID for ``query``, None if nothing is close."""
+        index = self.index(query)
+        return self.ids[index] if index is not None else None
+
+    def complete(self, prefix: str) -> list[tuple[str, int]]:
+        if not self.normalize(prefix):
+            indices = range(min(self.max_choices, len(self.ids)))
+        else:
+            indices = self.prefixed(prefix)
+            if indices is None:
+                indices = self.closest(prefix, limit=5)
+        return [(self.names[i], self.ids[i]) for i in indices]
+
 
 class ClashRoyaleUtils:
     """
@@ -11,99 +405,111 @@ class ClashRoyaleUtils:
 
     @staticmethod
     async def build_player_embed(player: dict) -> discord.Embed:
+        return PLAYER_TEMPLATE.render(_found(player))
+
+    @staticmethod
+    async def build_trophy_history_embed(
+        tag: str, history: list[dict]
+    ) -> discord.Embed:
+        lines = []
+        previous = None
+        for snapshot in history:
+            trophies = snapshot["trophies"]
+            line = f"<t:{snapshot['taken_at']}:d> **{trophies}**"
+            if previous is not None and trophies != previous:
+                line += f" ({trophies - previous:+})"
+            lines.append(line)
+            previous = trophies
+
         embed = discord.Embed(
-            title="{0} {1}".format(player.get("name"), player.get("tag"))
+            title=f"Trophy History #{tag.lstrip('#').upper()}",
+            description="\n".join(lines),
         )
-        embed.add_field(name="King Level", value=player.get("expLevel"))
-        embed.add_field(name="Current Trophies", value=player.get("trophies"))
-        try:
-            embed.add_field(
-                name="Season High",
-                value=player.get("leagueStatistics")
-                .get("currentSeason")
-                .get("bestTrophies"),
-            )
-        except AttributeError:
-            embed.add_field(name="Season High", value="N/A")
-        try:
-            embed.add_field(
-                name="Previous Season",
-                value=player.get("leagueStatistics")
-                .get("previousSeason")
-                .get("trophies"),
-            )
-        except AttributeError:
-            embed.add_field(name="Previous Season", value="N/A")
-        embed.add_field(name="Highest Trophies", value=player.get("bestTrophies"))
-        embed.add_field(name="Arena", value=player.get("arena").get("name"))
-        embed.add_field(name="Wins", value=player.get("wins"))
-        embed.add_field(name="Losses", value=player.get("losses"))
-        ladder_battle_count = player.get("wins") + player.get("losses")
-        embed.add_field(
-            name="Winrate",
-            value="{}%".format(
-                round((player.get("wins") / ladder_battle_count) * 100, 1)
-            ),
-        )
-        embed.add_field(name="Total Battle Count", value=player.get("battleCount"))
-        embed.add_field(name="Three Crowns", value=player.get("threeCrownWins"))
-        embed.add_field(name="Max Challenge Wins", value=player.get("challengeMaxWins"))
-        embed.add_field(
-            name="Challenge Cards Won", value=player.get("challengeCardsWon")
+        embed.set_footer(text="Only includes times the player was looked up.")
+        return embed
+
+    @staticmethod
+    async def build_progress_embed(tag: str, first: dict, last: dict) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"Progress #{tag.lstrip('#').upper()}",
+            description=f"<t:{first['taken_at']}:R> to <t:{last['taken_at']}:R>",
         )
-        embed.add_field(name="Total Donations", value=player.get("totalDonations"))
-        embed.add_field(name="Star Points", value=player.get("starPoints") or "N/A")
-        embed.add_field(name="CW1 Warday Wins", value=player.get("warDayWins"))
-        embed.add_field(
-            name="CW1 Clan Cards Collected", value=player.get("clanCardsCollected")
+        fields = {
+            "Trophies": "trophies",
+            "Highest Trophies": "best_trophies",
+            "King Level": "exp_level",
+            "Wins": "wins",
+            "Losses": "losses",
+            "Battles": "battle_count",
+            "Three Crowns": "three_crown_wins",
+            "Donations": "total_donations",
+        }
+        for name, column in fields.items():
+            before, after = first[column], last[column]
+            if before is None or after is None:
+                embed.add_field(name=name, value=after if after is not None else "N/A")
+                continue
+            embed.add_field(name=name, value=f"{after} ({after - before:+})")
+        return embed
+
+    @staticmethod
+    async def build_battle_stats_embed(tag: str, stats: BattleStats) -> discord.Embed:
+        embed = discord.Embed(
+            title=f"Last {stats.battles} Battles #{tag.lstrip('#').upper()}",
+            description=f"**{stats.wins}W {stats.losses}L {stats.draws}D** "
+            f"({stats.win_rate:.0%}) | Trophies: {stats.trophy_delta:+}",
         )
-        role = player.get("role")
-        if role == "coLeader":
-            role = "co-leader"
-        role = list(role)
-        role[0] = role[0].upper()
-        role = "".join(role)
-        embed.add_field(
-            name=f"{role} in",
-            value="[{0}](https://royaleapi.com/clan/{1})".format(
-                player.get("clan").get("name"), player.get("clan").get("tag")[1:]
-            ),
+
+        for cards, games, rate in stats.top_decks():
+            embed.add_field(
+                name=f"Deck | {games} games | {rate:.0%} wins",
+                value=", ".join(cards) or "None",
+                inline=False,
+            )
+
+        usage = "\n".join(f"{name}: {rate:.0%}" for name, rate in stats.most_used())
+        embed.add_field(name="Most Used Cards", value=usage or "None")
+
+        best = "\n".join(
+            f"{name}: {rate:.0%} ({games})" for name, games, rate in stats.matchups()
         )
-        age = "Unknown"
-        for badge in player.get("badges"):
-            if badge.get("name") == "Played1Year":
-                age = badge.get("progress")
-                y = age // 365
-                m = (age - y * 365) // 30
-                d = age - y * 365 - m * 30
-                age = "{0} years {1} months {2} days".format(y, m, d)
-                break
-        embed.add_field(name="Account Age", value=age)
-        badges = [
-            badge.get("name")
-            if not badge.get("level")
-            else "{0} **Level: {1}**".format(badge.get("name"), badge.get("level"))
-            for badge in player.get("badges")
-        ]
-        badges = [re.sub("(\d+(\.\d+)?)", r" \1 ", badge) for badge in badges]
-        try:
-            badges.remove("TopLeague")
-        except ValueError:
-            pass
-        embed.add_field(name="Badges", value=", ".join(badges) or "None")
-        current_deck = [card.get("name") for card in player.get("currentDeck")]
-        embed.add_field(name="Current Deck", value=", ".join(current_deck))
-        embed.set_thumbnail(
-            url="https://th.bing.com/th/id/R.dc47e311fb4fb32c139c5a4146e020a8?rik=hu1IfHDubAYwuQ&riu=http%3a%2f%2fvignette4.wikia.nocookie.net%2fclashroyale%2fimages%2fe%2fed%2fLegendary_Arena.png%2frevision%2flatest%3fcb%3d20160218170847&ehk=Y%2bGqOSGsU0zs9IdWUUFM0jhEBL8WKy7D3Ki81xm2Ovc%3d&risl=&pid=ImgRaw&r=0"
+        embed.add_field(name="Best Matchups", value=best or "Not enough battles")
+        worst = "\n".join(
+            f"{name}: {rate:.0%} ({games})"
+            for name, games, rate in stats.matchups(best=False)
         )
+        embed.add_field(name="Worst Matchups", value=worst or "Not enough battles")
         return embed
 
     @staticmethod
-    def search_for_card(cards: list, name: str) -> dict:
-        for card in cards:
-            if card.get("name").lower() == name.lower():
-                return card
-        raise ValueError("Hey! That's not a real card.")
+    async def build_roster_digest_embed(clan: dict, diff: RosterDiff) -> discord.Embed:
+        embed = discord.Embed(
+            title="{0} {1}".format(clan.get("name"), clan.get("tag")),
+            description=f"{clan.get('members')}/50 members",
+        )
+
+        def role(name: str) -> str:
+            return ROLES.get(name) or _capitalize(name)
+
+        def moved(before, after) -> str:
+            return f"{after.name}: {role(before.role)} -> {role(after.role)}"
+
+        sections = {
+            "Joined": [f"{m.name} | {m.trophies}" for m in diff.joined],
+            "Left": [f"{m.name} | {m.trophies}" for m in diff.left],
+            "Promoted": [moved(*change) for change in diff.promoted],
+            "Demoted": [moved(*change) for change in diff.demoted],
+            "Top Donors": [f"{m.name}: +{amount}" for m, amount in diff.donations[:5]],
+        }
+        for name, lines in sections.items():
+            if not lines:
+                continue
+            # field values cap out at 1024 characters
+            value = "\n".join(lines[:15])
+            if len(lines) > 15:
+                value += f"\n...and {len(lines) - 15} more"
+            embed.add_field(name=name, value=value[:1024], inline=False)
+        return embed
 
     @staticmethod
     async def build_card_embed(card: dict) -> discord.Embed:
@@ -114,45 +520,7 @@ class ClashRoyaleUtils:
 
     @staticmethod
     async def build_clan_embed(clan: dict) -> discord.Embed:
-        embed = discord.Embed(title="{0} {1}".format(clan.get("name"), clan.get("tag")))
-        embed.add_field(name="Score", value=clan.get("clanScore"))
-        embed.add_field(name="Clan War Trophies", value=clan.get("clanWarTrophies"))
-        embed.add_field(name="Location", value=clan.get("location").get("name"))
-        embed.add_field(name="Required Trophies", value=clan.get("requiredTrophies"))
-        embed.add_field(name="Donations Per Week", value=clan.get("donationsPerWeek"))
-        leader = None
-        members = clan.get("memberList")
-        for member in members:
-            if member.get("role") == "leader":
-                leader = member
-        embed.add_field(
-            name="Leader",
-            value="[{0}](https://royaleapi.com/player/{1})".format(
-                leader.get("name"), leader.get("tag")[1:]
-            ),
-        )
-        trophy_range = "{0}-{1}".format(
-            members[-1].get("trophies"), members[0].get("trophies")
-        )
-        embed.add_field(name="Trophy Range", value=trophy_range)
-        embed.add_field(name="Members", value="{0}/50".format(clan.get("members")))
-        if clan.get("type") == "inviteOnly":
-            clan["type"] = "invite only"
-        t = list(clan["type"])
-        t[0] = t[0].upper()
-        t = "".join(t)
-        embed.add_field(name="Join Status", value=t)
-        embed.add_field(name="Description", value="{}".format(clan.get("description")))
-        members = clan.get("memberList")
-        members = [
-            "{} | {}".format(member.get("name"), member.get("trophies"))
-            for member in members[:5]
-        ]
-        if clan.get("members") >= 5:
-            embed.add_field(name="Top Members", value="\n".join(members))
-        embed.set_thumbnail(
-            url="https://www.deckshop.pro/img/badges/{0}.png".format(
-                clan.get("badgeId")
-            )
-        )
-        return embed
+        return CLAN_TEMPLATE.render(_found(clan))
+
+
+LOCATIONS = LocationIndex(locations, location_codes, location_aliases)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Sequence
+
+import discord
+
+# every extractor gets the payload and whatever the template's ``prepare`` returned
+Extractor = Callable[[dict, Any], Any]
+
+
+def path(*keys: str | int, default: Any = None) -> Extractor:
+    """
+    ``path("arena", "name")`` compiles to ``data["arena"]["name"]``.
+    ``default`` is returned if any key along the way is missing or null.
+    """
+    if len(keys) == 1:
+        (key,) = keys
+
+        def extract(data: dict, _) -> Any:
+            value = data.get(key)
+            return default if value is None else value
+
+        return extract
+
+    def extract(data: dict, _) -> Any:
+        for key in keys:
+            try:
+                data = data[key]
+            except (KeyError, IndexError, TypeError):
+                return default
+            if data is None:
+                return default
+        return data
+
+    return extract
+
+
+def prepared(key: str, default: Any = None) -> Extractor:
+    """A value computed by the template's ``prepare`` step."""
+
+    def extract(_, context: dict) -> Any:
+        return context.get(key, default)
+
+    return extract
+
+
+def fmt(template: str, *extractors: Extractor) -> Extractor:
+    """``str.format`` over the results of other extractors."""
+    render = template.format
+
+    def extract(data: dict, context: Any) -> str:
+        return render(*(extractor(data, context) for extractor in extractors))
+
+    return extract
+
+
+def _compile(spec: str | Extractor) -> str | Extractor:
+    # constants are converted once here instead of on every render
+    return spec if callable(spec) else str(spec)
+
+
+class Field:
+    __slots__ = ("name", "value", "inline")
+
+    def __init__(
+        self,
+        name: str | Extractor,
+        value: str | Extractor,
+        *,
+        inline: bool = True,
+    ):
+        self.name = _compile(name)
+        self.value = _compile(value)
+        self.inline = inline
+
+
+class EmbedTemplate:
+    """
+    An embed described once and compiled into extractor functions.
+
+    ``prepare`` runs once per render for anything that has to walk the
+    payload, its result is handed to every extractor so the walk isn't repeated.
+    Fields whose ``when`` returns False are skipped.
+    """
+
+    def __init__(
+        self,
+        *,
+        title: str | Extractor,
+        fields: Sequence[Field | tuple[Field, Extractor]],
+        thumbnail: str | Extractor | None = None,
+        prepare: Callable[[dict], Any] | None = None,
+    ):
+        self.title = _compile(title)
+        self.thumbnail = _compile(thumbnail) if thumbnail is not None else None
+        self.prepare = prepare
+
+        self.fields: list[
+            tuple[str | Extractor, str | Extractor, bool, Extractor | None]
+        ] = []
+        for field in fields:
+            when = None
+            if isinstance(field, tuple):
+                field, when = field
+            self.fields.append((field.name, field.value, field.inline, when))
+
+    def render(self, data: dict) -> discord.Embed:
+        context = self.prepare(data) if self.prepare is not None else None
+
+        fields = [
+            {
+                "name": name if name.__class__ is str else str(name(data, context)),
+                "value": value if value.__class__ is str else str(value(data, context)),
+                "inline": inline,
+            }
+            for name, value, inline, when in self.fields
+            if when is None or when(data, context)
+        ]
+        payload: dict[str, Any] = {
+            "type": "rich",
+            "title": self._render(self.title, data, context),
+            "fields": fields,
+        }
+        if self.thumbnail is not None:
+            payload["thumbnail"] = {"url": self._render(self.thumbnail, data, context)}
+        return discord.Embed.from_dict(payload)
+
+    @staticmethod
+    def _render(spec: str | Extractor, data: dict, context: Any) -> str:
+        return spec if spec.__class__ is str else str(spec(data, context))
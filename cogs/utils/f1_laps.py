@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+def lap_millis(time: str) -> int:
+    """``1:32.123`` -> ``92123``, laps under a minute may not have minutes."""
+    minutes, _, seconds = time.rpartition(":")
+    return int(minutes or 0) * 60000 + round(float(seconds) * 1000)
+
+
+def lap_clock(millis: float) -> str:
+    """``92123`` -> ``1:32.123``"""
+    if millis != millis:
+        return "-"
+    minutes, millis = divmod(int(round(millis)), 60000)
+    return f"{minutes}:{millis / 1000:06.3f}"
+
+
+class LapTable:
+    """
+    Ergast laps as a drivers x laps matrix of milliseconds.
+
+    The laps are walked once, laps a driver didn't do (retirements, lapped
+    cars at the end) are NaN so every comparison is an array operation.
+    """
+
+    def __init__(self, laps: list[dict]):
+        self.drivers: list[str] = []
+        self.index: dict[str, int] = {}
+        self.laps = len(laps)
+
+        rows: list[int] = []
+        columns: list[int] = []
+        millis: list[int] = []
+        for column, lap in enumerate(laps):
+            for timing in lap.get("Timings", ()):
+                driver = timing["driverId"]
+                row = self.index.get(driver)
+                if row is None:
+                    row = self.index[driver] = len(self.drivers)
+                    self.drivers.append(driver)
+                rows.append(row)
+                columns.append(column)
+                millis.append(lap_millis(timing["time"]))
+
+        self.times = np.full((len(self.drivers), self.laps), np.nan)
+        self.times[rows, columns] = millis
+
+        # race time at the end of every lap, NaN from the first lap a driver missed
+        self.elapsed = np.cumsum(self.times, axis=1)
+
+    def __contains__(self, driver: str) -> bool:
+        return driver in self.index
+
+    def rows(self, drivers: Sequence[str]) -> np.ndarray:
+        return np.array([self.index[driver] for driver in drivers], dtype=np.intp)
+
+    def select(self, drivers: Sequence[str]) -> np.ndarray:
+        """Lap times of ``drivers``, one row each in the order given."""
+        return self.times[self.rows(drivers)]
+
+    def delta(self, driver: str, reference: str) -> np.ndarray:
+        """Per lap, how much slower ``driver`` was than ``reference``."""
+        return self.times[self.index[driver]] - self.times[self.index[reference]]
+
+    def gap_to_leader(self, drivers: Sequence[str] | None = None) -> np.ndarray:
+        """Milliseconds behind whoever had done the lap quickest so far."""
+        leader = np.nanmin(self.elapsed, axis=0) if self.drivers else 0
+        gaps = self.elapsed - leader
+        return gaps if drivers is None else gaps[self.rows(drivers)]
+
+    def final_gaps(self, drivers: Sequence[str]) -> np.ndarray:
+        """The gap at every driver's last lap, NaN for drivers without laps."""
+        done = np.count_nonzero(~np.isnan(self.select(drivers)), axis=1)
+        if not self.laps:
+            return np.full(len(drivers), np.nan)
+        gaps = self.gap_to_leader(drivers)[np.arange(len(drivers)), done - 1]
+        return np.where(done > 0, gaps, np.nan)
+
+    def best(self, drivers: Sequence[str]) -> np.ndarray:
+        return np.nanmin(self.select(drivers), axis=1)
+
+    def average(self, drivers: Sequence[str]) -> np.ndarray:
+        return np.nanmean(self.select(drivers), axis=1)
+
+    def pit_laps(self, driver: str, threshold: float = 1.1) -> np.ndarray:
+        """
+        Lap numbers that were ``threshold`` times slower than the driver's median.
+        Ergast laps don't say where a stop was, a stop's in-lap is slow enough.
+        """
+        times = self.times[self.index[driver]]
+        slow = times > np.nanmedian(times) * threshold
+        # the start and a stop's out-lap are slow too, a stint can't be one lap
+        slow[0] = False
+        slow[1:] &= ~slow[:-1]
+        return np.flatnonzero(slow) + 1
+
+    def stint_averages(
+        self, driver: str, pits: Sequence[int] | None = None, threshold: float = 1.1
+    ) -> list[tuple[int, int, float]]:
+        """
+        ``(first lap, last lap, average)`` of every stint,
+        stints end on the laps in ``pits`` which are detected if not given.
+        Slow laps are left out of the averages.
+        """
+        times = self.times[self.index[driver]]
+        done = int(np.count_nonzero(~np.isnan(times)))
+        if not done:
+            return []
+        if pits is None:
+            pits = self.pit_laps(driver, threshold)
+        pits = np.asarray(pits, dtype=np.intp)
+
+        starts = np.concatenate(([0], pits[(pits > 0) & (pits < done)]))
+        ends = np.append(starts[1:], done)
+        times = times[:done]
+        clean = np.where(times > np.nanmedian(times) * threshold, np.nan, times)
+        valid = ~np.isnan(clean)
+        totals = np.add.reduceat(np.where(valid, clean, 0), starts)
+        counts = np.add.reduceat(valid, starts)
+        averages = np.divide(
+            totals, counts, out=np.full(len(starts), np.nan), where=counts > 0
+        )
+        return [
+            (int(start) + 1, int(end), float(average))
+            for start, end, average in zip(starts, ends, averages)
+        ]
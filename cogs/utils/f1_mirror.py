@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+import re
+import time
+import zlib
+
+import aiosqlite
+
+from cogs.utils import fastjson
+
+_season_re = re.compile(r"^/?(\d{4})(?:/|$)")
+
+
+def route_season(route: str) -> int | None:
+    """``/2021/5/results`` -> ``2021``, None for ``current`` and all-time routes."""
+    match = _season_re.match(route)
+    return int(match.group(1)) if match else None
+
+
+def route_key(route: str, params: dict) -> str:
+    route = "/" + route.strip("/")
+    if not params:
+        return route
+    query = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+    return f"{route}?{query}"
+
+
+class ErgastMirror:
+    """
+    Ergast responses for finished seasons in SQLite.
+    A finished season never changes, so whatever is stored is served forever.
+    """
+
+    def __init__(self, path: str = "cogs/databases/ergast.db"):
+        self.path = path
+        self.db: aiosqlite.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+
+    async def connect(self) -> None:
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.executescript("""CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    season INTEGER NOT NULL,
+                    fetched_at INTEGER NOT NULL,
+                    body BLOB NOT NULL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS responses_season ON responses (season);""")
+        await self.db.commit()
+
+    async def close(self) -> None:
+        if self.db is not None:
+            await self.db.close()
+            self.db = None
+
+    async def get(self, route: str, params: dict) -> dict | None:
+        if self.db is None:
+            return None
+
+        async with self.db.execute(
+            "SELECT body FROM responses WHERE key = ?", (route_key(route, params),)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return fastjson.loads(zlib.decompress(row[0]))
+
+    async def put(self, season: int, route: str, params: dict, data: dict) -> None:
+        if self.db is None:
+            return
+
+        body = zlib.compress(json.dumps(data, separators=(",", ":")).encode(), 9)
+        await self.db.execute(
+            "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+            (route_key(route, params), season, int(time.time()), body),
+        )
+        await self.db.commit()
+
+    async def stored(self, season: int) -> set[str]:
+        """Keys already mirrored for a season, so a backfill can skip them."""
+        if self.db is None:
+            return set()
+
+        async with self.db.execute(
+            "SELECT key FROM responses WHERE season = ?", (season,)
+        ) as cursor:
+            return {row[0] for row in await cursor.fetchall()}
+
+    async def stats(self) -> dict[str, int]:
+        seasons = rows = size = 0
+        if self.db is not None:
+            async with self.db.execute(
+                "SELECT COUNT(DISTINCT season), COUNT(*), TOTAL(LENGTH(body)) "
+                "FROM responses"
+            ) as cursor:
+                seasons, rows, size = await cursor.fetchone()
+        return {
+            "seasons": seasons,
+            "responses": rows,
+            "bytes": int(size),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
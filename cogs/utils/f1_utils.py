@@ -2,15 +2,20 @@
 
 from __future__ import annotations
 
-import asyncio
 from typing import TYPE_CHECKING
 from io import BytesIO
 
 import discord
-import matplotlib as mlt
-import matplotlib.pyplot as plt
+import numpy as np
 from discord.ext import commands
 
+from cogs.utils.f1_laps import LapTable, lap_clock
+from cogs.utils.plots import (
+    PlotRenderer,
+    RendererBusy,
+    RendererUnavailable,
+    render_lap_times,
+)
 from cogs.utils.view import View
 
 if TYPE_CHECKING:
@@ -48,14 +53,6 @@ def humanize_time(millis: float, *_) -> str:
     return time
 
 
-def time_to_millis(time: str) -> int:
-    time = time.replace(".", ":")
-    minutes, seconds, millis = time.split(":")
-
-    total = (int(minutes) * 60000) + (int(seconds) * 1000) + int(millis)
-    return total
-
-
 class YearConverter(commands.Converter):
     async def convert(self, ctx: commands.Context, argument: str) -> int:
         if int(argument) >= 1950:
@@ -127,7 +124,38 @@ class DriverResultsView(View):
         select = DriverSelect(list(drivers))
         self.add_item(select)
 
-        self.lap_data = [lap["Timings"] for lap in lap_times]
+        # parsed once, every plot and comparison after that slices it
+        self.laps = LapTable(lap_times)
+
+    def driver_colors(self, drivers: list[str]) -> list[discord.Color]:
+        colors = []
+        for driver in drivers:
+            color = F1Utils.team_colors.get(F1Utils.driver_teams.get(driver))
+            colors.append(
+                discord.Color.from_rgb(*color)
+                if isinstance(color, tuple)
+                else discord.Color.random()
+            )
+        return colors
+
+    async def plot(
+        self, interaction: discord.Interaction, drivers: list[str], names, colors
+    ) -> discord.File | None:
+        try:
+            return await F1Utils.build_lap_times_plot(
+                self.cog.plots, self.laps.select(drivers), names, colors
+            )
+        except RendererBusy:
+            await interaction.followup.send(
+                "Too many charts are being drawn right now, try again in a moment.",
+                ephemeral=True,
+            )
+            return None
+        except RendererUnavailable:
+            await interaction.followup.send(
+                "Charts can't be drawn right now.", ephemeral=True
+            )
+            return None
 
     async def set(self, driver: str | None = None, embed: discord.Embed = None):
         embed = embed if embed else self.drivers.get(driver)
@@ -168,44 +196,36 @@ class DriverResultsView(View):
         await interaction.followup.send(view=view, ephemeral=True)
         await view.wait()
 
-        data = []
-        drivers = []
-        colors = []
-
-        for driver in select.values:
-            times = await F1Utils.process_lap_times(self.lap_data, driver)
-            data.append(times)
-
-            drivers.append(F1Utils.driver_ids[driver])
-
-            color = F1Utils.team_colors.get(F1Utils.driver_teams.get(driver))
-            color = (
-                discord.Color.from_rgb(*color)
-                if isinstance(color, tuple)
-                else discord.Color.random()
-            )
-            colors.append(color)
+        drivers = [driver for driver in select.values if driver in self.laps]
+        if not drivers:
+            await interaction.followup.send("No lap times for those drivers.")
+            return
+        names = [F1Utils.driver_ids[driver] for driver in drivers]
 
-        plot = await F1Utils.build_lap_times_plot(data, drivers, colors)
-        await interaction.followup.send(file=plot)
+        embed = await F1Utils.build_lap_comparison_embed(self.laps, drivers)
+        plot = await self.plot(interaction, drivers, names, self.driver_colors(drivers))
+        if plot is None:
+            await interaction.followup.send(embed=embed)
+            return
+        await interaction.followup.send(embed=embed, file=plot)
 
     @discord.ui.button(label="Lap Times", style=discord.ButtonStyle.gray, disabled=True)
     async def lap_times(self, interaction, button):
         await interaction.response.defer()
-        times = await F1Utils.process_lap_times(self.lap_data, self.current_driver)
-        plot = await F1Utils.build_lap_times_plot(
-            [times], [self.current_driver], [self.current_embed.color]
+        names = {v: k for k, v in F1Utils.driver_ids.items()}
+        driver = names.get(self.current_driver, self.current_driver)
+        if driver not in self.laps:
+            await interaction.followup.send("No lap times for that driver.")
+            return
+
+        plot = await self.plot(
+            interaction, [driver], [self.current_driver], [self.current_embed.color]
         )
-        await interaction.followup.send(file=plot)
+        if plot is not None:
+            await interaction.followup.send(file=plot)
 
 
 class F1Utils:
-    import warnings
-
-    warnings.filterwarnings("ignore", category=UserWarning)
-
-    plot_lock = asyncio.Lock()
-
     team_colors: dict[str, tuple[int, int, int]] = {
         "ferrari": (237, 28, 36),
         "red_bull": (30, 91, 198),
@@ -427,43 +447,37 @@ class F1Utils:
         return embeds
 
     @classmethod
-    async def process_lap_times(cls, lap_data, driver) -> list[int]:
-        data = []
-        for lap in lap_data:
-            for d in lap:
-                try:
-                    if driver in (cls.driver_ids[d["driverId"]], d["driverId"]):
-                        data.append(d["time"])
-                except KeyError:
-                    pass
-
-        return [time_to_millis(time) for time in data]
+    async def build_lap_comparison_embed(
+        cls, laps: LapTable, drivers: list[str]
+    ) -> discord.Embed:
+        best = laps.best(drivers)
+        average = laps.average(drivers)
+        gaps = laps.final_gaps(drivers)
+
+        embed = discord.Embed(title="Lap Comparison")
+        for i, driver in enumerate(drivers):
+            stints = " | ".join(
+                f"{first}-{last}: {lap_clock(avg)}"
+                for first, last, avg in laps.stint_averages(driver)
+            )
+            if np.isnan(gaps[i]):
+                gap = "-"
+            else:
+                gap = "Leader" if gaps[i] == 0 else f"+{gaps[i] / 1000:.3f}s"
+            embed.add_field(
+                name=cls.driver_ids.get(driver, driver),
+                value=f"Best: {lap_clock(best[i])}\n"
+                f"Average: {lap_clock(average[i])}\n"
+                f"Gap: {gap}\n"
+                f"Stints: {stints or '-'}",
+            )
+        return embed
 
     @classmethod
     async def build_lap_times_plot(
-        cls, data: list[list[int]], drivers, colors: list
+        cls, renderer: PlotRenderer, data: np.ndarray, drivers, colors: list
     ) -> discord.File:
-        def blocking_build() -> discord.File:
-            fig, ax = plt.subplots()
-            ax.yaxis.set_major_formatter(mlt.ticker.FuncFormatter(humanize_time))
-
-            for i, d in enumerate(data):
-                x = [i for i in range(1, len(d) + 1)]
-                y = d
-                y.extend(0 for _ in range(len(x) - len(y)))  # in case of DNF
-
-                ax.plot(x, y, label=drivers[i], color=str(colors[i]))
-
-            plt.xlabel("Lap")
-            plt.ylabel("Time")
-            plt.title("Driver Lap Times")
-            plt.legend()
-
-            with BytesIO() as image_binary:
-                fig.savefig(image_binary, format="png")
-                image_binary.seek(0)
-                file = discord.File(image_binary, "lap_times.png")
-            return file
-
-        async with cls.plot_lock:
-            return await asyncio.to_thread(blocking_build)
+        image = await renderer.render(
+            render_lap_times, data, list(drivers), [str(color) for color in colors]
+        )
+        return discord.File(BytesIO(image), "lap_times.png")
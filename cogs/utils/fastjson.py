@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+    BACKEND = "orjson"
+
+    def loads(data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+else:
+    BACKEND = "json"
+
+    def loads(data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+# bodies bigger than this are decoded in a worker thread
+# both decoders hold the GIL so this only lets the loop get a turn
+# every switch interval, it's not worth the thread hop for small bodies
+OFFLOAD_THRESHOLD = 1024 * 1024
+
+
+async def decode(body: bytes, *, threshold: int = OFFLOAD_THRESHOLD) -> Any:
+    if not body:
+        return None
+    if len(body) < threshold:
+        return loads(body)
+    return await asyncio.to_thread(loads, body)
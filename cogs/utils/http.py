@@ -1,40 +1,246 @@
 import asyncio
+import time
 
 import requests
 import aiohttp
 
+from cogs.utils import fastjson, metrics
+from cogs.utils.breaker import CircuitBreaker, ServiceUnavailable, backoff, get_breaker
+from cogs.utils.cache import ResponseCache, MISSING, match_ttl
+from cogs.utils.ratelimit import TokenBucket, get_bucket
+from cogs.utils.session import SessionManager
+
 
 def cleanup_params(params: dict) -> dict:
     return {k: v for k, v in params.items() if v is not None}
 
 
 class AsyncHTTPClient:
-    session: aiohttp.ClientSession | None = None
+    # route pattern -> seconds to cache the response for
+    # patterns are matched against the route without the base and suffix
+    cache_ttls: dict[str, float] = {}
+    default_ttl: float = 0
+    cache_max_bytes: int = 4 * 1024 * 1024
+
+    # requests per second to the host, None to only follow the server's headers
+    # the bucket is shared by every client with the same host
+    rate_limit: float | None = None
+    rate_burst: int = 1
+    max_throttled_retries: int = 1
+
+    # GETs are retried on connection errors, timeouts and 5xx responses
+    # waiting a random time up to backoff_base * 2 ** attempt between tries
+    max_retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8
+    request_timeout: float = 15
+
+    # consecutive failures before requests to the host fail fast
+    failure_threshold: int = 5
+    breaker_reset_timeout: float = 30
+
+    # identical GETs in flight share one upstream call, turn it off for
+    # endpoints that answer something random every time
+    coalesce: bool = True
+
+    # JSON bodies bigger than this many bytes are decoded off the event loop
+    json_offload_threshold: int = fastjson.OFFLOAD_THRESHOLD
 
     def __init__(self, base_url, *, headers=None, loop=None, suffix: str = ""):
         self.base = base_url
         self.loop = loop
         self.headers = headers
         self.suffix = suffix
+        self.session: aiohttp.ClientSession | None = None
+        self.sessions: SessionManager | None = None
+        self.cache = ResponseCache(self.cache_max_bytes)
+        # anything with an ``add(method, resp, body)`` method, used to record fixtures
+        self.recorder = None
+        self.metrics = metrics.for_client(self)
+        self._inflight: dict[tuple, asyncio.Task] = {}
+        self.coalesced = 0
+        self.limiter: TokenBucket = get_bucket(
+            base_url, self.rate_limit, self.rate_burst
+        )
+        self.breaker: CircuitBreaker = get_breaker(
+            base_url,
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.breaker_reset_timeout,
+        )
+
+    def rebase(self, base_url: str) -> None:
+        """
+        Point the client at another server, like a local replay server.
+        The client gets its own limiter and breaker instead of the shared ones.
+        """
+        self.base = base_url
+        self.limiter = TokenBucket(self.rate_limit, self.rate_burst)
+        self.breaker = CircuitBreaker(
+            base_url,
+            failure_threshold=self.failure_threshold,
+            reset_timeout=self.breaker_reset_timeout,
+        )
+        self.cache.clear()
 
-    @classmethod
-    async def create(cls, loop: asyncio.AbstractEventLoop = None):
-        if cls.session is not None:
+    async def create(self, sessions: SessionManager):
+        if self.sessions is not None:
             return
-        cls.session = aiohttp.ClientSession(loop=loop)
+        self.sessions = sessions
+        self.session = await sessions.acquire()
+
+    @property
+    def degraded(self) -> bool:
+        """Whether the upstream is failing and requests are being refused."""
+        return self.breaker.degraded
+
+    def cache_key(self, method: str, route: str, params: dict) -> tuple:
+        return (
+            method.upper(),
+            route,
+            tuple(sorted((k, str(v)) for k, v in params.items())),
+        )
+
+    def ttl_for(self, method: str, route: str) -> float:
+        if method.upper() != "GET":
+            return 0
+        return match_ttl(self.cache_ttls, route, self.default_ttl)
 
     async def request(self, route, json=True, method: str = "GET", **params):
         params = cleanup_params(params)
-        async with self.session.request(
-            method, self.base + route + self.suffix, params=params, headers=self.headers
-        ) as resp:
-            if json:
-                return await resp.json()
-            return await resp.text()
-
-    @classmethod
-    async def close(cls):
-        if not cls.session:
+
+        ttl = self.ttl_for(method, route)
+        key = self.cache_key(method, route, params) + (json,)
+        if ttl > 0:
+            cached = self.cache.get(key)
+            if cached is not MISSING:
+                return cached
+
+        if method.upper() != "GET" or not self.coalesce:
+            return await self._fetch(key, ttl, method, route, params, json)
+
+        # identical GETs share one upstream call
+        # shield so a cancelled caller doesn't cancel it for everyone else
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch(key, ttl, method, route, params, json)
+            )
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _forget(self, key: tuple, task: asyncio.Task) -> None:
+        self._inflight.pop(key, None)
+        # mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def conditional_headers(self, key: tuple) -> dict[str, str]:
+        headers = dict(self.headers or {})
+        entry = self.cache.peek(key)
+        if entry is None:
+            return headers
+
+        if entry.etag is not None:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified is not None:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    async def _send(self, method, route, params, json, headers=None):
+        self.metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            async with self.session.request(
+                method,
+                self.base + route + self.suffix,
+                params=params,
+                headers=headers or self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            ) as resp:
+                body = await resp.read()
+                text = None if json else await resp.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+            self.metrics.observe(
+                route, time.perf_counter() - start, type(exc).__name__
+            )
+            raise
+        finally:
+            self.metrics.in_flight -= 1
+
+        self.metrics.observe(route, time.perf_counter() - start, resp.status, len(body))
+        if self.recorder is not None:
+            self.recorder.add(method, resp, body)
+        return resp, body, text
+
+    async def _fetch(self, key, ttl, method, route, params, json, conditional=True):
+        retries = self.max_retries if method.upper() == "GET" else 0
+        attempt = 0
+        throttled = 0
+        headers = self.conditional_headers(key) if ttl > 0 and conditional else None
+
+        while True:
+            self.breaker.check()
+            await self.limiter.acquire()
+
+            failed = True
+            try:
+                resp, body, text = await self._send(
+                    method, route, params, json, headers
+                )
+                failed = resp.status >= 500
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            else:
+                self.limiter.update(resp.status, resp.headers)
+                if resp.status == 429 and throttled < self.max_throttled_retries:
+                    # the limiter is blocked until Retry-After so just go again
+                    throttled += 1
+                    continue
+                if not failed or attempt >= retries:
+                    break
+            finally:
+                # a cancelled probe shouldn't leave the breaker half open forever
+                if failed:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+
+            await asyncio.sleep(backoff(attempt, self.backoff_base, self.backoff_max))
+            attempt += 1
+
+        if resp.status == 304 and headers is not None:
+            if self.cache.peek(key) is not None:
+                # not modified, skip downloading and decoding it again
+                return self.cache.refresh(key, ttl)
+            # evicted while the request was in flight, there's no body to reuse
+            return await self._fetch(
+                key, ttl, method, route, params, json, conditional=False
+            )
+
+        if json:
+            data = await fastjson.decode(body, threshold=self.json_offload_threshold)
+        else:
+            data = text
+
+        if ttl > 0 and 200 <= resp.status < 300:
+            self.cache.set(
+                key,
+                data,
+                ttl,
+                size=len(body),
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+        return data
+
+    async def close(self):
+        # only give the session back, other cogs may still be using it
+        if self.sessions is None:
             return
-        if not cls.session.closed:
-            await cls.session.close()
+        await self.sessions.release()
+        self.sessions = None
+        self.session = None
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+
+import aiosqlite
+
+
+class SettingsMap(dict):
+    """
+    A settings table held in memory, keyed by its first column.
+
+    ``load`` fills it with one SELECT instead of one per guild, channel or user.
+    Keys without a row get ``default()`` the first time they're indexed,
+    so guilds that join later don't have to be set up anywhere.
+    """
+
+    def __init__(self, default: Callable[[], Any] | None = None):
+        super().__init__()
+        self.default = default
+
+    def __missing__(self, key):
+        if self.default is None:
+            raise KeyError(key)
+        value = self[key] = self.default()
+        return value
+
+    async def load(
+        self,
+        db: aiosqlite.Connection,
+        query: str,
+        parameters: Iterable = (),
+        *,
+        convert: Callable[..., Any] | None = None,
+        only: Iterable[int] | None = None,
+    ) -> int:
+        """
+        ``query`` selects the key first and then the values.
+        ``convert`` is called with the values of a row to make what's stored,
+        a single value is stored as is and several as a tuple otherwise.
+        ``only`` drops rows whose key isn't in it.
+
+        Returns how many rows were loaded.
+        """
+        # fetchall is one trip to aiosqlite's thread, iterating the cursor
+        # fetches arraysize (1) rows per trip
+        async with db.execute(query, tuple(parameters)) as cursor:
+            rows = await cursor.fetchall()
+
+        keep = set(only) if only is not None else None
+        loaded = 0
+        for key, *values in rows:
+            if keep is not None and key not in keep:
+                continue
+            if convert is not None:
+                value = convert(*values)
+            elif len(values) == 1:
+                value = values[0]
+            else:
+                value = tuple(values)
+            self[key] = value
+            loaded += 1
+        return loaded
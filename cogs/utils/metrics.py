@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import bisect
+import re
+import weakref
+from collections import Counter, deque
+from typing import TYPE_CHECKING
+
+from aiohttp import web
+
+if TYPE_CHECKING:
+    from cogs.utils.http import AsyncHTTPClient
+
+
+# seconds
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+RENDER_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.5, 5.0, 10.0)
+
+_tag_re = re.compile(r"%23\w+")
+_id_re = re.compile(r"(?<=/)[^/]*\d[^/]*(?=/|$)")
+
+
+def route_label(route: str) -> str:
+    """Collapse tags and ids so every player doesn't get their own time series."""
+    route = "/" + route.strip("/")
+    route = _tag_re.sub("{tag}", route)
+    return _id_re.sub("{id}", route)
+
+
+class Histogram:
+    """
+    Prometheus style cumulative histogram.
+    The most recent samples are also kept to work out exact percentiles.
+    """
+
+    def __init__(
+        self, buckets: tuple[float, ...] = LATENCY_BUCKETS, window: int = 1024
+    ):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentile(self, pct: float) -> float:
+        if not self.recent:
+            return 0.0
+        values = sorted(self.recent)
+        index = min(int(len(values) * pct / 100), len(values) - 1)
+        return values[index]
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return result
+
+
+class ClientMetrics:
+    def __init__(self, name: str):
+        self.name = name
+        self.latency: dict[str, Histogram] = {}
+        self.statuses: Counter[tuple[str, str]] = Counter()
+        self.bytes_in: Counter[str] = Counter()
+        self.in_flight = 0
+        self._client: weakref.ref[AsyncHTTPClient] | None = None
+
+    @property
+    def client(self) -> AsyncHTTPClient | None:
+        return self._client() if self._client else None
+
+    @client.setter
+    def client(self, client: AsyncHTTPClient) -> None:
+        self._client = weakref.ref(client)
+
+    def observe(
+        self, route: str, seconds: float, status: int | str, size: int = 0
+    ) -> None:
+        route = route_label(route)
+        try:
+            histogram = self.latency[route]
+        except KeyError:
+            histogram = self.latency[route] = Histogram()
+
+        histogram.observe(seconds)
+        self.statuses[route, str(status)] += 1
+        self.bytes_in[route] += size
+
+
+# kept by client class name so reloading a cog doesn't reset them
+clients: dict[str, ClientMetrics] = {}
+
+
+def for_client(client: AsyncHTTPClient) -> ClientMetrics:
+    name = type(client).__name__
+    try:
+        metrics = clients[name]
+    except KeyError:
+        metrics = clients[name] = ClientMetrics(name)
+    metrics.client = client
+    return metrics
+
+
+class StoreMetrics:
+    """Write-behind flushes of one store."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.flush = Histogram(DB_BUCKETS)
+        self.rows = 0
+        self.failures = 0
+        self.pending = 0
+
+    def observe(self, seconds: float, rows: int) -> None:
+        self.flush.observe(seconds)
+        self.rows += rows
+
+
+stores: dict[str, StoreMetrics] = {}
+
+
+def for_store(name: str) -> StoreMetrics:
+    try:
+        return stores[name]
+    except KeyError:
+        metrics = stores[name] = StoreMetrics(name)
+        return metrics
+
+
+class RendererMetrics:
+    """Charts drawn by one renderer's process pool."""
+
+    def __init__(self, name: str):
+        self.name = name
+        # time in the worker, and time waiting for a free worker before that
+        self.render = Histogram(RENDER_BUCKETS)
+        self.wait = Histogram(RENDER_BUCKETS)
+        self.failures = 0
+        self.rejected = 0
+        self.pending = 0
+
+
+renderers: dict[str, RendererMetrics] = {}
+
+
+def for_renderer(name: str) -> RendererMetrics:
+    try:
+        return renderers[name]
+    except KeyError:
+        metrics = renderers[name] = RendererMetrics(name)
+        return metrics
+
+
+def _labels(**labels: str) -> str:
+    inner = ",".join(
+        '{0}="{1}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels.items()
+    )
+    return "{" + inner + "}"
+
+
+def render_prometheus() -> str:
+    lines: list[str] = []
+
+    def header(name: str, kind: str, text: str):
+        lines.append(f"# HELP {name} {text}")
+        lines.append(f"# TYPE {name} {kind}")
+
+    name = "masterbot_http_request_duration_seconds"
+    header(name, "histogram", "Upstream request latency.")
+    for metrics in clients.values():
+        for route, histogram in metrics.latency.items():
+            for le, count in histogram.cumulative():
+                labels = _labels(client=metrics.name, route=route, le=le)
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _labels(client=metrics.name, route=route)
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    name = "masterbot_http_responses_total"
+    header(name, "counter", "Upstream responses by status code.")
+    for metrics in clients.values():
+        for (route, status), count in metrics.statuses.items():
+            labels = _labels(client=metrics.name, route=route, status=status)
+            lines.append(f"{name}{labels} {count}")
+
+    name = "masterbot_http_response_bytes_total"
+    header(name, "counter", "Bytes read from upstream.")
+    for metrics in clients.values():
+        for route, size in metrics.bytes_in.items():
+            lines.append(f"{name}{_labels(client=metrics.name, route=route)} {size}")
+
+    name = "masterbot_http_in_flight"
+    header(name, "gauge", "Upstream requests in flight.")
+    for metrics in clients.values():
+        lines.append(f"{name}{_labels(client=metrics.name)} {metrics.in_flight}")
+
+    gauges = {
+        "masterbot_http_cache_hits_total": ("counter", "Response cache hits."),
+        "masterbot_http_cache_misses_total": ("counter", "Response cache misses."),
+        "masterbot_http_cache_hit_ratio": ("gauge", "Response cache hit ratio."),
+        "masterbot_http_cache_bytes": ("gauge", "Response cache size."),
+        "masterbot_http_coalesced_total": ("counter", "Requests that shared a call."),
+        "masterbot_http_ratelimit_queue_depth": ("gauge", "Requests waiting."),
+        "masterbot_http_circuit_open": ("gauge", "1 if the circuit is not closed."),
+    }
+    values: dict[str, list[tuple[str, float]]] = {name: [] for name in gauges}
+    for metrics in clients.values():
+        client = metrics.client
+        if client is None:
+            continue
+        labels = _labels(client=metrics.name)
+        cache = client.cache
+        values["masterbot_http_cache_hits_total"].append((labels, cache.hits))
+        values["masterbot_http_cache_misses_total"].append((labels, cache.misses))
+        values["masterbot_http_cache_hit_ratio"].append((labels, cache.hit_ratio))
+        values["masterbot_http_cache_bytes"].append((labels, cache.current_bytes))
+        values["masterbot_http_coalesced_total"].append((labels, client.coalesced))
+        values["masterbot_http_ratelimit_queue_depth"].append(
+            (labels, client.limiter.waiting)
+        )
+        values["masterbot_http_circuit_open"].append((labels, int(client.degraded)))
+
+    for name, (kind, text) in gauges.items():
+        header(name, kind, text)
+        lines.extend(f"{name}{labels} {value}" for labels, value in values[name])
+
+    name = "masterbot_db_flush_duration_seconds"
+    header(name, "histogram", "Write-behind flush latency.")
+    for metrics in stores.values():
+        for le, count in metrics.flush.cumulative():
+            lines.append(f"{name}_bucket{_labels(store=metrics.name, le=le)} {count}")
+        labels = _labels(store=metrics.name)
+        lines.append(f"{name}_sum{labels} {metrics.flush.sum}")
+        lines.append(f"{name}_count{labels} {metrics.flush.count}")
+
+    store_values = {
+        "masterbot_db_flushed_rows_total": ("counter", "Rows written.", "rows"),
+        "masterbot_db_flush_failures_total": ("counter", "Failed flushes.", "failures"),
+        "masterbot_db_dirty_rows": ("gauge", "Rows waiting to be written.", "pending"),
+    }
+    for name, (kind, text, attribute) in store_values.items():
+        header(name, kind, text)
+        for metrics in stores.values():
+            value = getattr(metrics, attribute)
+            lines.append(f"{name}{_labels(store=metrics.name)} {value}")
+
+    for name, attribute, text in (
+        ("masterbot_render_duration_seconds", "render", "Chart render time."),
+        ("masterbot_render_wait_seconds", "wait", "Time charts waited for a worker."),
+    ):
+        header(name, "histogram", text)
+        for metrics in renderers.values():
+            histogram = getattr(metrics, attribute)
+            for le, count in histogram.cumulative():
+                labels = _labels(renderer=metrics.name, le=le)
+                lines.append(f"{name}_bucket{labels} {count}")
+            labels = _labels(renderer=metrics.name)
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+    renderer_values = {
+        "masterbot_render_failures_total": ("counter", "Failed renders.", "failures"),
+        "masterbot_render_rejected_total": (
+            "counter",
+            "Renders turned away because the queue was full.",
+            "rejected",
+        ),
+        "masterbot_render_pending": ("gauge", "Renders queued or running.", "pending"),
+    }
+    for name, (kind, text, attribute) in renderer_values.items():
+        header(name, kind, text)
+        for metrics in renderers.values():
+            value = getattr(metrics, attribute)
+            lines.append(f"{name}{_labels(renderer=metrics.name)} {value}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serves ``/metrics`` in the Prometheus text format."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108):
+        self.host = host
+        self.port = port
+        self._runner: web.AppRunner | None = None
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/metrics", self.handle)
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.host, self.port).start()
+        except OSError:
+            # e.g. the port is taken, don't leave the runner behind
+            await self.close()
+            raise
+
+    async def close(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.Response(
+            body=render_prometheus().encode(),
+            headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        )
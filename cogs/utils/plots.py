@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from typing import Any, Callable, Sequence
+
+import numpy as np
+
+from cogs.utils import metrics
+from cogs.utils.f1_laps import lap_clock
+
+_log = logging.getLogger(__name__)
+
+
+class RendererBusy(Exception):
+    """Raised instead of queueing a chart when the renderer's queue is full."""
+
+    def __init__(self, pending: int):
+        self.pending = pending
+        super().__init__(f"{pending} charts are already waiting to be drawn")
+
+
+class RendererUnavailable(Exception):
+    """Raised when the workers died, e.g. because they couldn't start at all."""
+
+    def __init__(self):
+        super().__init__("charts can't be drawn right now")
+
+
+def _init_worker() -> None:
+    # the workers only ever draw to PNGs, matplotlib is imported once per worker
+    import warnings
+
+    import matplotlib
+
+    matplotlib.use("Agg")
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+
+def _timed(func: Callable[..., bytes], args: tuple) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    image = func(*args)
+    return image, time.perf_counter() - start
+
+
+def render_lap_times(
+    times: np.ndarray, drivers: Sequence[str], colors: Sequence[str]
+) -> bytes:
+    """
+    A PNG of one line per row of ``times``, NaN laps leave a gap.
+    Runs in a worker, so it only gets picklable arguments and returns bytes.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from matplotlib.ticker import FuncFormatter
+
+    # a Figure that pyplot doesn't know about, nothing keeps it alive
+    # after it's cleared here
+    figure = Figure()
+    FigureCanvasAgg(figure)
+    try:
+        ax = figure.subplots()
+        ax.yaxis.set_major_formatter(FuncFormatter(lambda millis, _: lap_clock(millis)))
+
+        x = np.arange(1, times.shape[1] + 1)
+        for row, driver, color in zip(times, drivers, colors):
+            ax.plot(x, row, label=driver, color=color)
+
+        ax.set_xlabel("Lap")
+        ax.set_ylabel("Time")
+        ax.set_title("Driver Lap Times")
+        ax.legend()
+
+        with BytesIO() as image:
+            figure.savefig(image, format="png")
+            return image.getvalue()
+    finally:
+        figure.clear()
+
+
+class PlotRenderer:
+    """
+    Draws charts in a pool of processes so they don't share one core or the GIL.
+
+    At most ``max_pending`` charts are queued or being drawn,
+    ``render`` raises RendererBusy past that instead of letting them pile up.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        workers: int | None = None,
+        max_pending: int | None = None,
+    ):
+        self.name = name
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self.max_pending = max_pending or max(8, self.workers * 4)
+        self.metrics = metrics.for_renderer(name)
+        self._pool: ProcessPoolExecutor | None = None
+        self.broken = False
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        # processes are only started once the first chart is asked for
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.workers,
+                # forking the bot would copy its threads' locks into the workers
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._pool
+
+    async def render(self, func: Callable[..., bytes], *args: Any) -> bytes:
+        if self.broken:
+            raise RendererUnavailable()
+        if self.metrics.pending >= self.max_pending:
+            self.metrics.rejected += 1
+            raise RendererBusy(self.metrics.pending)
+
+        loop = asyncio.get_running_loop()
+        self.metrics.pending += 1
+        start = time.perf_counter()
+        try:
+            image, seconds = await loop.run_in_executor(self.pool, _timed, func, args)
+        except BrokenProcessPool as exc:
+            # a worker that dies while starting takes the pool with it, and a
+            # new pool would die the same way, so stop trying
+            self.metrics.failures += 1
+            if not self.broken:
+                self.broken = True
+                self.close()
+                _log.error(
+                    f"The {self.name} renderer's workers died, charts are off. "
+                    "If they couldn't start, the launcher probably needs an "
+                    "if __name__ == '__main__': guard.",
+                    exc_info=exc,
+                )
+            raise RendererUnavailable() from exc
+        except Exception:
+            self.metrics.failures += 1
+            raise
+        finally:
+            self.metrics.pending -= 1
+
+        self.metrics.render.observe(seconds)
+        self.metrics.wait.observe(max(time.perf_counter() - start - seconds, 0))
+        return image
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Mapping
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    A FIFO token bucket for one upstream host.
+    ``rate`` is tokens per second, ``None`` means only server side limits apply.
+    """
+
+    def __init__(self, rate: float | None = None, capacity: int = 1):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+        # asyncio.Lock wakes waiters in order so the queue is fair
+        self._lock = asyncio.Lock()
+
+        self.waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            self.tokens = float(self.capacity)
+        else:
+            elapsed = now - self.updated
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    if now < self.blocked_until:
+                        await asyncio.sleep(self.blocked_until - now)
+                        continue
+
+                    self._refill(now)
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        break
+                    await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self.acquired += 1
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        return waited
+
+    async def __aenter__(self) -> TokenBucket:
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *_) -> None:
+        pass
+
+    def block(self, seconds: float) -> None:
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+    def update(self, status: int, headers: Mapping[str, str]) -> float:
+        """
+        Read the rate limit headers of a response.
+        Returns how long the host asked us to wait, 0 if it didn't.
+        """
+        delay = 0.0
+        if status == 429 or status == 503:
+            delay = parse_retry_after(headers.get("Retry-After"))
+            if status == 429:
+                self.throttled += 1
+                delay = delay or 1.0
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is not None and reset is not None:
+            try:
+                if int(float(remaining)) <= 0:
+                    delay = max(delay, parse_reset(reset))
+            except ValueError:
+                pass
+
+        if delay > 0:
+            self.block(delay)
+        return delay
+
+    def stats(self) -> dict[str, int | float]:
+        return {
+            "queue_depth": self.waiting,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "avg_wait": round(self.total_wait / self.acquired, 4)
+            if self.acquired
+            else 0.0,
+            "max_wait": round(self.max_wait, 4),
+            "blocked_for": round(max(self.blocked_until - time.monotonic(), 0), 2),
+        }
+
+
+def parse_retry_after(value: str | None) -> float:
+    if not value:
+        return 0.0
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return max(when.timestamp() - time.time(), 0.0)
+
+
+def parse_reset(value: str) -> float:
+    # some APIs send an epoch timestamp, others the seconds left
+    try:
+        reset = float(value)
+    except ValueError:
+        return 0.0
+    if reset > 1_000_000_000:
+        reset -= time.time()
+    return max(reset, 0.0)
+
+
+_buckets: dict[str, TokenBucket] = {}
+
+
+def get_bucket(url: str, rate: float | None, capacity: int) -> TokenBucket:
+    """Get the shared bucket for the host of ``url``."""
+    host = urlsplit(url).netloc or url
+    try:
+        bucket = _buckets[host]
+    except KeyError:
+        bucket = _buckets[host] = TokenBucket(rate, capacity)
+    return bucket
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+
+
+class SessionManager:
+    """
+    Owns the one aiohttp session the whole bot uses.
+    Cogs borrow it with ``acquire`` and give it back with ``release``.
+    The session is kept open for ``linger`` seconds after the last release
+    so reloading a cog reuses the warm connection pool.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        linger: float = 120,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.linger = linger
+
+        self.session: aiohttp.ClientSession | None = None
+        self.references = 0
+        self._close_handle: asyncio.TimerHandle | None = None
+
+    def _new_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            enable_cleanup_closed=True,
+        )
+        return aiohttp.ClientSession(connector=connector)
+
+    async def acquire(self) -> aiohttp.ClientSession:
+        if self._close_handle is not None:
+            self._close_handle.cancel()
+            self._close_handle = None
+
+        if self.session is None or self.session.closed:
+            self.session = self._new_session()
+
+        self.references += 1
+        return self.session
+
+    async def release(self) -> None:
+        if self.references == 0:
+            return
+        self.references -= 1
+
+        if self.references == 0 and self._close_handle is None:
+            loop = asyncio.get_running_loop()
+            self._close_handle = loop.call_later(
+                self.linger, lambda: loop.create_task(self._close_if_unused())
+            )
+
+    async def _close_if_unused(self) -> None:
+        self._close_handle = None
+        if self.references == 0:
+            await self.close()
+
+    async def close(self) -> None:
+        if self._close_handle is not None:
+            self._close_handle.cancel()
+            self._close_handle = None
+
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+        self.session = None
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-from typing import TypeVar
+from typing import Callable, Sequence, TypeVar
 
 import discord
 from discord.ext import commands
@@ -39,10 +39,33 @@ class View(discord.ui.View):
 MISSING = discord.utils.MISSING
 
 
+class LazyPages(Sequence[discord.Embed]):
+    """Pages for a Paginator that are built the first time they're shown."""
+
+    def __init__(self, count: int, build: Callable[[int], discord.Embed]):
+        self.count = count
+        self.build = build
+        self._pages: dict[int, discord.Embed] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> discord.Embed:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        try:
+            return self._pages[index]
+        except KeyError:
+            page = self._pages[index] = self.build(index)
+            return page
+
+
 class Paginator(View):
     def __init__(
         self,
-        pages: list[discord.Embed],
+        pages: Sequence[discord.Embed],
         *,
         timeout: float = 180,
         starting_page: int = 0
@@ -1,3 +1,8 @@
+import functools
+import re
+import unicodedata
+from collections import OrderedDict
+
 import pytz
 from datetime import datetime
 import time
@@ -6,6 +11,138 @@ from typing import Optional
 import discord
 from discord.ext import commands
 
+from cogs.utils.view import LazyPages
+
+_punctuation = re.compile(r"[\W_]+")
+
+
+def normalize_location(query: str) -> str:
+    """``São Paulo,  BR`` -> ``sao paulo br``"""
+    query = unicodedata.normalize("NFKD", query.casefold())
+    query = "".join(char for char in query if not unicodedata.combining(char))
+    return " ".join(_punctuation.sub(" ", query).split())
+
+
+@functools.lru_cache(maxsize=512)
+def get_timezone(tz_id: str) -> pytz.BaseTzInfo:
+    return pytz.timezone(tz_id)
+
+
+class TimezoneResolver:
+    """
+    Answers timezone lookups without the API when it can.
+
+    The gazetteer starts with the cities in the tz database names
+    (``Europe/London`` is London) and learns every place the weather API
+    returns, so a city asked about once is known from then on.
+    """
+
+    areas = {
+        "Africa",
+        "America",
+        "Antarctica",
+        "Asia",
+        "Atlantic",
+        "Australia",
+        "Europe",
+        "Indian",
+        "Pacific",
+    }
+
+    def __init__(self, maxsize: int = 8192):
+        self.maxsize = maxsize
+        # seeded from the tz names, never evicted
+        self.zones: dict[str, dict] = {}
+        # learnt from the API, least recently used first
+        self.places: OrderedDict[str, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        countries = {
+            zone: pytz.country_names.get(code, "")
+            for code, zones in pytz.country_timezones.items()
+            for zone in zones
+        }
+        # only Area/City, the last part of America/Argentina/San_Juan or
+        # America/Indiana/Knox is a province or county, not the city people mean
+        cities: dict[str, list[str]] = {}
+        for zone in pytz.common_timezones:
+            area, _, city = zone.partition("/")
+            if area not in self.areas or not city or "/" in city:
+                continue
+            cities.setdefault(normalize_location(city), []).append(zone)
+
+        for alias, zones in cities.items():
+            if len(zones) > 1:
+                continue
+            (zone,) = zones
+            # the tz area isn't a region, the embed leaves it out
+            self.zones[alias] = {
+                "name": zone.partition("/")[2].replace("_", " "),
+                "region": "",
+                "country": countries.get(zone, ""),
+                "tz_id": zone,
+            }
+
+    def learn(self, location: dict, query: str | None = None) -> None:
+        if not location.get("tz_id"):
+            return
+        place = {
+            "name": location.get("name"),
+            "region": location.get("region"),
+            "country": location.get("country"),
+            "tz_id": location["tz_id"],
+        }
+        # what the API resolved a query to, and the full name which is only
+        # this place, a bare name like "paris" is shared by several
+        aliases = [
+            " ".join(location.get(part) or "" for part in ("name", "region", "country"))
+        ]
+        if query is not None:
+            aliases.append(query)
+        for alias in aliases:
+            alias = normalize_location(alias)
+            if not alias:
+                continue
+            self.places[alias] = place
+            self.places.move_to_end(alias)
+        while len(self.places) > self.maxsize:
+            self.places.popitem(last=False)
+            self.evictions += 1
+
+    def resolve(self, query: str) -> dict | None:
+        """A timezone response for ``query`` built locally, None on a miss."""
+        alias = normalize_location(query)
+        # what the API answered beats a guess from the tz names
+        place = self.places.get(alias)
+        if place is not None:
+            self.places.move_to_end(alias)
+        else:
+            place = self.zones.get(alias)
+        if place is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        now = datetime.now(get_timezone(place["tz_id"]))
+        return {
+            "location": {
+                **place,
+                "localtime_epoch": int(now.timestamp()),
+                "localtime": now.strftime("%Y-%m-%d %H:%M"),
+            }
+        }
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self.places),
+            "zones": len(self.zones),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
 
 class WeatherUtils:
     @staticmethod
@@ -13,7 +150,7 @@ class WeatherUtils:
         embed = discord.Embed(
             title=f'{data.get("location").get("name")}, {data.get("location").get("region")}, {data.get("location").get("country")}',
         )
-        tz = pytz.timezone(data["location"]["tz_id"])
+        tz = get_timezone(data["location"]["tz_id"])
         local_time = datetime.fromtimestamp(data["location"]["localtime_epoch"], tz)
         local_time = local_time.strftime("%H:%M")
         embed.set_footer(text=f"Local Time: {local_time}")
@@ -44,29 +181,27 @@ class WeatherUtils:
         return embed
 
     @staticmethod
-    async def build_forecast_embed(data, ctx, self, days) -> Optional[discord.Embed]:
-        days -= 1
+    def build_forecast_pages(data, temp_unit="C", speed_unit="kph") -> LazyPages:
+        """Every day of one forecast response, each embed built when it's first shown."""
+        return LazyPages(
+            len(data.get("forecast").get("forecastday")),
+            lambda day: WeatherUtils.build_forecast_day_embed(
+                data, day, temp_unit, speed_unit
+            ),
+        )
+
+    @staticmethod
+    def build_forecast_day_embed(
+        data, day_index, temp_unit="C", speed_unit="kph"
+    ) -> discord.Embed:
         embed = discord.Embed(
             title=f'{data.get("location").get("name")}, {data.get("location").get("region")}, {data.get("location").get("country")}'
         )
-        try:
-            data = data.get("forecast").get("forecastday")[days]
-        except IndexError:
-            if isinstance(ctx, commands.Context):
-                await ctx.send(
-                    f"I couldn't find anything for {days} days away. Try another number."
-                )
-            else:
-                await ctx.response.send_message(
-                    f"I couldn't find anything for {days} days away. Try another number."
-                )
-            return
+        data = data.get("forecast").get("forecastday")[day_index]
         date = round(
             time.mktime(datetime.fromtimestamp(data.get("date_epoch")).timetuple())
         )
         embed.add_field(name="Forecast Date", value=f"<t:{date}:D>")
-        temp_unit = self.temp_units.get(ctx.guild.id) or "C"
-        speed_unit = self.speed_units.get(ctx.guild.id) or "kph"
         day = data.get("day")
         weather = day.get("condition").get("text")
         embed.add_field(name="Weather", value=weather)
@@ -126,8 +261,18 @@ class WeatherUtils:
 
     @staticmethod
     async def build_tz_embed(data) -> discord.Embed:
+        location = data.get("location")
+        # places from the tz names have no region
         embed = discord.Embed(
-            title=f'{data.get("location").get("name")}, {data.get("location").get("region")}, {data.get("location").get("country")}'
+            title=", ".join(
+                part
+                for part in (
+                    location.get("name"),
+                    location.get("region"),
+                    location.get("country"),
+                )
+                if part
+            )
         )
         embed.add_field(name="Timezone ID", value=data.get("location").get("tz_id"))
         embed.add_field(name="Local Time", value=data.get("location").get("localtime"))
@@ -1,13 +1,22 @@
+import asyncio
+import time
+from collections import OrderedDict
 from typing import Optional, Literal
 
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
 import aiosqlite
-from aiosqlite import IntegrityError
 
+from cogs.utils import metrics
 from cogs.utils.http import AsyncHTTPClient
-from cogs.utils.weather_utils import WeatherUtils
+from cogs.utils.hydrate import SettingsMap
+from cogs.utils.view import Paginator
+from cogs.utils.weather_utils import (
+    TimezoneResolver,
+    WeatherUtils,
+    normalize_location,
+)
 from cogs.utils.app_and_cogs import Cog
 from bot import MasterBot
 
@@ -17,25 +26,223 @@ class FlagUnits(commands.FlagConverter):
     temp: Optional[str] = None
 
 
+class GeocodeCache:
+    """
+    Normalized location queries mapped to the place's ``lat,lon``.
+
+    It's learnt from current and forecast responses, and the
+    coordinates are sent instead of the query. Every spelling of a city
+    then asks for the same thing and shares one cached response.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._keys: OrderedDict[str, str] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def coordinates(location: dict) -> str | None:
+        lat, lon = location.get("lat"), location.get("lon")
+        if lat is None or lon is None:
+            return None
+        return f"{lat:.2f},{lon:.2f}"
+
+    def get(self, query: str) -> str | None:
+        alias = normalize_location(query)
+        key = self._keys.get(alias)
+        if key is None:
+            self.misses += 1
+            return None
+        self._keys.move_to_end(alias)
+        self.hits += 1
+        return key
+
+    def _put(self, alias: str, key: str) -> None:
+        if not alias:
+            return
+        self._keys[alias] = key
+        self._keys.move_to_end(alias)
+        while len(self._keys) > self.maxsize:
+            self._keys.popitem(last=False)
+            self.evictions += 1
+
+    def learn(self, location: dict, query: str | None = None) -> None:
+        key = self.coordinates(location)
+        if key is None:
+            return
+
+        # what the user typed is what the API resolved it to
+        if query is not None:
+            self._put(normalize_location(query), key)
+
+        # only the full name is certain to be this place, a bare name like
+        # "paris" or "paris united states" is shared by several
+        self._put(normalize_location(self.full_name(location)), key)
+
+    @staticmethod
+    def full_name(location: dict) -> str:
+        return " ".join(
+            location.get(part) or "" for part in ("name", "region", "country")
+        )
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "size": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
 class WeatherAPIHTTPClient(AsyncHTTPClient):
+    cache_ttls = {
+        "current": 5 * 60,
+        "forecast": 30 * 60,
+        "search": 24 * 60 * 60,
+        "timezone": 24 * 60 * 60,
+    }
+    # forecasts are large, a few days with hourly data is ~100KB
+    cache_max_bytes = 16 * 1024 * 1024
+    # the most days the free plan gives
+    forecast_days = 3
+    rate_limit = 5
+    rate_burst = 5
+
     def __init__(self, api_key, loop):
         super().__init__("http://api.weatherapi.com/v1/", loop=loop, suffix=".json")
         self.api_key = api_key
+        self.geocode = GeocodeCache()
+        self.timezones = TimezoneResolver()
 
     async def request(self, route, json=True, **params):
         return await super().request(route=route, json=json, key=self.api_key, **params)
 
+    async def located(self, route, location, **params):
+        """Request ``route`` for ``location``, by its coordinates when they're known."""
+        key = self.geocode.get(location)
+        data = await self.request(route, q=key or location, **params)
+        if isinstance(data, dict) and data.get("location"):
+            if key is None:
+                self.geocode.learn(data["location"], location)
+            self.timezones.learn(data["location"], location)
+        return data
+
     async def current(self, location):
-        return await self.request("current", q=location, aqi="no")
+        return await self.located("current", location, aqi="no")
 
     async def forecast(self, location, days):
-        return await self.request("forecast", q=location, days=days)
+        # always the same number of days so every day asked for shares one response
+        return await self.located(
+            "forecast", location, days=max(days, self.forecast_days)
+        )
 
     async def search(self, query):
+        # results aren't learnt, the user hasn't said which place they meant
         return await self.request("search", q=query)
 
     async def timezone(self, location):
-        return await self.request("timezone", q=location)
+        # the local time is worked out here, the API is only asked about new places
+        data = self.timezones.resolve(location)
+        if data is None:
+            data = await self.located("timezone", location)
+        return data
+
+
+class UnitStore:
+    """
+    Guild weather units kept in memory and written behind.
+    Changes mark the guild dirty and only dirty guilds are written on a flush.
+    """
+
+    def __init__(self, path: str = "cogs/databases/units.db"):
+        self.path = path
+        self.db: aiosqlite.Connection | None = None
+        self.temp: dict[int, str] = {}
+        self.speed: dict[int, str] = {}
+        self.dirty: set[int] = set()
+        self.metrics = metrics.for_store("units")
+        # a flush the loop started finishes, or puts its rows back, before another
+        self._flushing = asyncio.Lock()
+
+    async def connect(self) -> None:
+        self.db = await aiosqlite.connect(self.path)
+        await self.db.execute(
+            """CREATE TABLE IF NOT EXISTS units (
+                                        id INTEGER PRIMARY KEY,
+                                        temp TEXT,
+                                        speed TEXT
+                                    );"""
+        )
+        await self.db.commit()
+
+    async def close(self) -> None:
+        if self.db is not None:
+            await self.flush()
+            async with self._flushing:
+                await self.db.close()
+                self.db = None
+
+    async def load(self, guild_ids=None) -> None:
+        rows = SettingsMap()
+        await rows.load(self.db, "SELECT id, temp, speed FROM units", only=guild_ids)
+        for guild_id, (temp, speed) in rows.items():
+            # anything set before the load finished wins
+            self.temp.setdefault(guild_id, temp)
+            self.speed.setdefault(guild_id, speed)
+
+    def set(self, guild_id: int, *, temp: str = None, speed: str = None) -> None:
+        if temp is not None and self.temp.get(guild_id) != temp:
+            self.temp[guild_id] = temp
+            self.dirty.add(guild_id)
+        if speed is not None and self.speed.get(guild_id) != speed:
+            self.speed[guild_id] = speed
+            self.dirty.add(guild_id)
+        self.metrics.pending = len(self.dirty)
+
+    async def flush(self) -> int:
+        """Write every dirty guild in one transaction, returns how many."""
+        async with self._flushing:
+            return await self._flush()
+
+    async def _flush(self) -> int:
+        if not self.dirty or self.db is None:
+            return 0
+
+        # swapped out first so changes made while writing go in the next flush
+        dirty, self.dirty = self.dirty, set()
+        rows = [
+            (
+                guild_id,
+                self.temp.get(guild_id, Weather.metric["temp"]),
+                self.speed.get(guild_id, Weather.metric["speed"]),
+            )
+            for guild_id in dirty
+        ]
+
+        start = time.perf_counter()
+        try:
+            await self.db.executemany(
+                """INSERT INTO units VALUES (?, ?, ?)
+                   ON CONFLICT (id) DO UPDATE SET
+                   temp = excluded.temp, speed = excluded.speed""",
+                rows,
+            )
+            await self.db.commit()
+        except BaseException:
+            # cancelling the loop mid-write lands here too, close waits on the
+            # lock until these are back and then writes them
+            self.dirty |= dirty
+            self.metrics.failures += 1
+            self.metrics.pending = len(self.dirty)
+            raise
+        self.metrics.observe(time.perf_counter() - start, len(rows))
+        self.metrics.pending = len(self.dirty)
+        return len(rows)
 
 
 class Weather(Cog, name="weather"):
@@ -46,72 +253,36 @@ class Weather(Cog, name="weather"):
         super().__init__(bot)
         self.api_key = self.bot.weather
         self.http = WeatherAPIHTTPClient(self.api_key, self.bot.loop)
-        self.temp_units = {}
-        self.speed_units = {}
-        self.db = None
+        self.unit_store = UnitStore()
         print("Weather cog loaded")
 
+    @property
+    def temp_units(self) -> dict[int, str]:
+        return self.unit_store.temp
+
+    @property
+    def speed_units(self) -> dict[int, str]:
+        return self.unit_store.speed
+
     async def cog_load(self):
         await super().cog_load()
+        await self.unit_store.connect()
         self.update_db.start()
 
     async def cog_unload(self):
         await super().cog_unload()
         self.update_db.cancel()
+        # written right away instead of waiting for the loop
+        await self.unit_store.close()
 
-    async def fetch_units(self):
-        for guild in self.bot.guilds:
-            async with self.db.execute(
-                f"""SELECT temp, speed FROM units
-                                        WHERE id = {guild.id};"""
-            ) as cursor:
-                data = await cursor.fetchone()
-            if data is None:
-                continue
-
-            temp, speed = data
-            self.temp_units[guild.id] = temp
-            self.speed_units[guild.id] = speed
-
-    @tasks.loop(minutes=3)
+    @tasks.loop(seconds=30)
     async def update_db(self):
-        for guild in self.bot.guilds:
-            if guild.id not in self.temp_units:
-                self.temp_units[guild.id] = self.metric["temp"]
-            if guild.id not in self.speed_units:
-                self.speed_units[guild.id] = self.metric["speed"]
-            try:
-                await self.db.execute(
-                    f"""INSERT INTO units VALUES ({guild.id},
-                '{self.temp_units[guild.id]}',
-                '{self.speed_units[guild.id]}')"""
-                )
-            except IntegrityError:
-                await self.db.execute(
-                    f"""UPDATE units
-                SET temp = '{self.temp_units[guild.id]}', speed = '{self.speed_units[guild.id]}'
-                WHERE id = {guild.id};"""
-                )
-        await self.db.commit()
+        await self.unit_store.flush()
 
     @update_db.before_loop
     async def before(self):
         await self.bot.wait_until_ready()
-        self.db = await aiosqlite.connect("cogs/databases/units.db")
-        await self.db.execute(
-            """CREATE TABLE IF NOT EXISTS units (
-                                        id INTEGER PRIMARY KEY,
-                                        temp TEXT,
-                                        speed TEXT
-                                    );"""
-        )
-        await self.db.commit()
-        await self.fetch_units()
-
-    @update_db.after_loop
-    async def after(self):
-        await self.update_db()
-        await self.db.close()
+        await self.unit_store.load(guild.id for guild in self.bot.guilds)
 
     async def cog_command_error(self, ctx, error):
         error: commands.CommandError
@@ -137,23 +308,21 @@ class Weather(Cog, name="weather"):
 
             if flags.temp:
                 if flags.temp.upper() in ("C", "F"):
-                    self.temp_units[ctx.guild.id] = flags.temp.upper()
+                    self.unit_store.set(ctx.guild.id, temp=flags.temp.upper())
                 else:
                     return await ctx.send("Temp can only be **c** or **f**")
 
             if flags.speed:
                 if flags.speed.lower() in ("mph", "kph"):
-                    self.speed_units[ctx.guild.id] = flags.speed.lower()
+                    self.unit_store.set(ctx.guild.id, speed=flags.speed.lower())
                 else:
                     return await ctx.send("Speed can only be **kph** or **mph**")
 
         elif isinstance(flags, str):
             if flags == "metric":
-                self.temp_units[ctx.guild.id] = self.metric["temp"]
-                self.speed_units[ctx.guild.id] = self.metric["speed"]
+                self.unit_store.set(ctx.guild.id, **self.metric)
             else:
-                self.temp_units[ctx.guild.id] = self.customary["temp"]
-                self.speed_units[ctx.guild.id] = self.customary["speed"]
+                self.unit_store.set(ctx.guild.id, **self.customary)
 
         else:
             await ctx.send(
@@ -163,7 +332,8 @@ class Weather(Cog, name="weather"):
             return
 
         await ctx.send(
-            f"New settings! Temp: `{self.temp_units[ctx.guild.id]}` Speed: `{self.speed_units[ctx.guild.id]}`"
+            f"New settings! Temp: `{self.temp_units.get(ctx.guild.id, self.metric['temp'])}` "
+            f"Speed: `{self.speed_units.get(ctx.guild.id, self.metric['speed'])}`"
         )
 
     @app_commands.command(name="units", description="Change the weather units")
@@ -186,7 +356,7 @@ class Weather(Cog, name="weather"):
 
         if temp:
             if temp.upper() in ("C", "F"):
-                self.temp_units[interaction.guild.id] = temp.upper()
+                self.unit_store.set(interaction.guild.id, temp=temp.upper())
             else:
                 return await interaction.response.send_message(
                     "Temp can only be **c** or **f**"
@@ -194,7 +364,7 @@ class Weather(Cog, name="weather"):
 
         if speed:
             if speed.lower() in ("mph", "kph"):
-                self.speed_units[interaction.guild.id] = speed.lower()
+                self.unit_store.set(interaction.guild.id, speed=speed.lower())
             else:
                 await interaction.response.send_message(
                     "Speed can only be **kph** or **mph**"
@@ -240,10 +410,20 @@ class Weather(Cog, name="weather"):
             await ctx.send(embed=error)
             return
 
-        embed = await WeatherUtils.build_forecast_embed(data, ctx, self, days)
-        if embed is None:
+        pages = WeatherUtils.build_forecast_pages(
+            data,
+            self.temp_units.get(ctx.guild.id) or "C",
+            self.speed_units.get(ctx.guild.id) or "kph",
+        )
+        if not 1 <= days <= len(pages):
+            await ctx.send(
+                f"I couldn't find anything for {days - 1} days away. Try another number."
+            )
             return
-        await ctx.send(embed=embed)
+
+        # the other days are already in the response, flipping to them is free
+        view = Paginator(pages, starting_page=days - 1)
+        await view.send(ctx)
 
     @commands.hybrid_command(aliases=["place", "town"], description="Search a city.")
     @app_commands.describe(
@@ -6,12 +6,12 @@ import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands, tasks
-import aiohttp
 import aiosqlite
 from aiosqlite import IntegrityError
 
 from bot import MasterBot
 from cogs.utils.app_and_cogs import Cog, NoPrivateMessage
+from cogs.utils.hydrate import SettingsMap
 from cogs.utils.view import View, smart_send
 
 
@@ -122,20 +122,20 @@ class Webhooks(Cog, name="webhooks"):
     def __init__(self, bot: MasterBot):
         super().__init__(bot)
         self.session = None
-        self.webhooks: dict[int, discord.Webhook] = {}
-        self.users: dict[int, dict[str, str | None]] = {}
+        self.webhooks: dict[int, discord.Webhook] = SettingsMap()
+        self.users: dict[int, dict[str, str | None]] = SettingsMap()
         self.db = None
         print("Webhook cog loaded")
 
     async def cog_load(self):
         await super().cog_load()
-        self.session = aiohttp.ClientSession(loop=self.bot.loop)
+        self.session = await self.bot.sessions.acquire()
         self.update_db.start()
         self.bot.tree.add_command(WebhookGroup(self))
 
     async def cog_unload(self):
         await super().cog_unload()
-        await self.session.close()
+        await self.bot.sessions.release()
         self.update_db.cancel()
         self.bot.tree.remove_command("webhook")
 
@@ -157,34 +157,28 @@ class Webhooks(Cog, name="webhooks"):
             await self.bot.on_command_error(ctx, error)
 
     async def fetch_webhooks(self):
-        for channel in self.bot.get_all_channels():
-            async with self.db.execute(
-                f"""SELECT webhook_id, webhook_token FROM webhooks
-                                           WHERE id = {channel.id};"""
-            ) as cursor:
-                data = await cursor.fetchone()
-            if data is None:
-                continue
-            webhook_id, webhook_token = data
-            self.webhooks[channel.id] = discord.Webhook.from_url(
+        def webhook(webhook_id: int, webhook_token: str) -> discord.Webhook:
+            return discord.Webhook.from_url(
                 url=f"https://discord.com/api/webhooks/{webhook_id}/{webhook_token}",
                 session=self.session,
                 bot_token=self.bot.http.token,
             )
 
-        users = list(set(self.bot.users))  # to remove dupes
-        for user in users:
-            cursor = await self.db.execute(
-                f"""SELECT name, avatar FROM users
-                                            WHERE id = {user.id}"""
-            )
-            data = await cursor.fetchone()
-            if data is None:
-                continue
-            name, avatar = data
-            if avatar == "None":
-                avatar = None
-            self.users[user.id] = {"name": name, "avatar": avatar}
+        def user(name: str, avatar: str) -> dict[str, str | None]:
+            return {"name": name, "avatar": None if avatar == "None" else avatar}
+
+        await self.webhooks.load(
+            self.db,
+            "SELECT id, webhook_id, webhook_token FROM webhooks",
+            convert=webhook,
+            only=(channel.id for channel in self.bot.get_all_channels()),
+        )
+        await self.users.load(
+            self.db,
+            "SELECT id, name, avatar FROM users",
+            convert=user,
+            only=(user.id for user in self.bot.users),
+        )
 
     @tasks.loop(minutes=7)
     async def update_db(self):
@@ -243,7 +237,6 @@ class Webhooks(Cog, name="webhooks"):
     async def close_session(self):
         await self.update_db()
         await self.db.close()
-        await self.session.close()
 
     @commands.group(description="Make a 'bot' account.")
     async def webhook(self, ctx: commands.Context):
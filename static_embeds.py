@@ -266,6 +266,310 @@ locations = {
     "zambia": 57000259,
     "zimbabwe": 57000260,
 }
+
+# ISO 3166 country codes as used in the API's countryCode field
+location_codes = {
+    "AF": "afghanistan",
+    "AX": "åland islands",
+    "AL": "albania",
+    "DZ": "algeria",
+    "AS": "american samoa",
+    "AD": "andorra",
+    "AO": "angola",
+    "AI": "anguilla",
+    "AQ": "antarctica",
+    "AG": "antigua and barbuda",
+    "AR": "argentina",
+    "AM": "armenia",
+    "AW": "aruba",
+    "AC": "ascension island",
+    "AU": "australia",
+    "AT": "austria",
+    "AZ": "azerbaijan",
+    "BS": "bahamas",
+    "BH": "bahrain",
+    "BD": "bangladesh",
+    "BB": "barbados",
+    "BY": "belarus",
+    "BE": "belgium",
+    "BZ": "belize",
+    "BJ": "benin",
+    "BM": "bermuda",
+    "BT": "bhutan",
+    "BO": "bolivia",
+    "BA": "bosnia and herzegovina",
+    "BW": "botswana",
+    "BV": "bouvet island",
+    "BR": "brazil",
+    "IO": "british indian ocean territory",
+    "VG": "british virgin islands",
+    "BN": "brunei",
+    "BG": "bulgaria",
+    "BF": "burkina faso",
+    "BI": "burundi",
+    "KH": "cambodia",
+    "CM": "cameroon",
+    "CA": "canada",
+    "IC": "canary islands",
+    "CV": "cape verde",
+    "BQ": "caribbean netherlands",
+    "KY": "cayman islands",
+    "CF": "central african republic",
+    "EA": "ceuta and melilla",
+    "TD": "chad",
+    "CL": "chile",
+    "CN": "china",
+    "CX": "christmas island",
+    "CC": "cocos (keeling) islands",
+    "CO": "colombia",
+    "KM": "comoros",
+    "CD": "congo (drc)",
+    "CG": "congo (republic)",
+    "CK": "cook islands",
+    "CR": "costa rica",
+    "CI": "côte d’ivoire",
+    "HR": "croatia",
+    "CU": "cuba",
+    "CW": "curaçao",
+    "CY": "cyprus",
+    "CZ": "czech republic",
+    "DK": "denmark",
+    "DG": "diego garcia",
+    "DJ": "djibouti",
+    "DM": "dominica",
+    "DO": "dominican republic",
+    "EC": "ecuador",
+    "EG": "egypt",
+    "SV": "el salvador",
+    "GQ": "equatorial guinea",
+    "ER": "eritrea",
+    "EE": "estonia",
+    "ET": "ethiopia",
+    "FK": "falkland islands",
+    "FO": "faroe islands",
+    "FJ": "fiji",
+    "FI": "finland",
+    "FR": "france",
+    "GF": "french guiana",
+    "PF": "french polynesia",
+    "TF": "french southern territories",
+    "GA": "gabon",
+    "GM": "gambia",
+    "GE": "georgia",
+    "DE": "germany",
+    "GH": "ghana",
+    "GI": "gibraltar",
+    "GR": "greece",
+    "GL": "greenland",
+    "GD": "grenada",
+    "GP": "guadeloupe",
+    "GU": "guam",
+    "GT": "guatemala",
+    "GG": "guernsey",
+    "GN": "guinea",
+    "GW": "guinea-bissau",
+    "GY": "guyana",
+    "HT": "haiti",
+    "HM": "heard & mcdonald islands",
+    "HN": "honduras",
+    "HK": "hong kong",
+    "HU": "hungary",
+    "IS": "iceland",
+    "IN": "india",
+    "ID": "indonesia",
+    "IR": "iran",
+    "IQ": "iraq",
+    "IE": "ireland",
+    "IM": "isle of man",
+    "IL": "israel",
+    "IT": "italy",
+    "JM": "jamaica",
+    "JP": "japan",
+    "JE": "jersey",
+    "JO": "jordan",
+    "KZ": "kazakhstan",
+    "KE": "kenya",
+    "KI": "kiribati",
+    "XK": "kosovo",
+    "KW": "kuwait",
+    "KG": "kyrgyzstan",
+    "LA": "laos",
+    "LV": "latvia",
+    "LB": "lebanon",
+    "LS": "lesotho",
+    "LR": "liberia",
+    "LY": "libya",
+    "LI": "liechtenstein",
+    "LT": "lithuania",
+    "LU": "luxembourg",
+    "MO": "macau",
+    "MK": "macedonia (fyrom)",
+    "MG": "madagascar",
+    "MW": "malawi",
+    "MY": "malaysia",
+    "MV": "maldives",
+    "ML": "mali",
+    "MT": "malta",
+    "MH": "marshall islands",
+    "MQ": "martinique",
+    "MR": "mauritania",
+    "MU": "mauritius",
+    "YT": "mayotte",
+    "MX": "mexico",
+    "FM": "micronesia",
+    "MD": "moldova",
+    "MC": "monaco",
+    "MN": "mongolia",
+    "ME": "montenegro",
+    "MS": "montserrat",
+    "MA": "morocco",
+    "MZ": "mozambique",
+    "MM": "myanmar (burma)",
+    "NA": "namibia",
+    "NR": "nauru",
+    "NP": "nepal",
+    "NL": "netherlands",
+    "NC": "new caledonia",
+    "NZ": "new zealand",
+    "NI": "nicaragua",
+    "NE": "niger",
+    "NG": "nigeria",
+    "NU": "niue",
+    "NF": "norfolk island",
+    "KP": "north korea",
+    "MP": "northern mariana islands",
+    "NO": "norway",
+    "OM": "oman",
+    "PK": "pakistan",
+    "PW": "palau",
+    "PS": "palestine",
+    "PA": "panama",
+    "PG": "papua new guinea",
+    "PY": "paraguay",
+    "PE": "peru",
+    "PH": "philippines",
+    "PN": "pitcairn islands",
+    "PL": "poland",
+    "PT": "portugal",
+    "PR": "puerto rico",
+    "QA": "qatar",
+    "RE": "réunion",
+    "RO": "romania",
+    "RU": "russia",
+    "RW": "rwanda",
+    "BL": "saint barthélemy",
+    "SH": "saint helena",
+    "KN": "saint kitts and nevis",
+    "LC": "saint lucia",
+    "MF": "saint martin",
+    "PM": "saint pierre and miquelon",
+    "WS": "samoa",
+    "SM": "san marino",
+    "ST": "são tomé and príncipe",
+    "SA": "saudi arabia",
+    "SN": "senegal",
+    "RS": "serbia",
+    "SC": "seychelles",
+    "SL": "sierra leone",
+    "SG": "singapore",
+    "SX": "sint maarten",
+    "SK": "slovakia",
+    "SI": "slovenia",
+    "SB": "solomon islands",
+    "SO": "somalia",
+    "ZA": "south africa",
+    "KR": "south korea",
+    "SS": "south sudan",
+    "ES": "spain",
+    "LK": "sri lanka",
+    "VC": "st. vincent & grenadines",
+    "SD": "sudan",
+    "SR": "suriname",
+    "SJ": "svalbard and jan mayen",
+    "SZ": "swaziland",
+    "SE": "sweden",
+    "CH": "switzerland",
+    "SY": "syria",
+    "TW": "taiwan",
+    "TJ": "tajikistan",
+    "TZ": "tanzania",
+    "TH": "thailand",
+    "TL": "timor-leste",
+    "TG": "togo",
+    "TK": "tokelau",
+    "TO": "tonga",
+    "TT": "trinidad and tobago",
+    "TA": "tristan da cunha",
+    "TN": "tunisia",
+    "TR": "turkey",
+    "TM": "turkmenistan",
+    "TC": "turks and caicos islands",
+    "TV": "tuvalu",
+    "UM": "u.s. outlying islands",
+    "VI": "u.s. virgin islands",
+    "UG": "uganda",
+    "UA": "ukraine",
+    "AE": "united arab emirates",
+    "GB": "united kingdom",
+    "US": "united states",
+    "UY": "uruguay",
+    "UZ": "uzbekistan",
+    "VU": "vanuatu",
+    "VA": "vatican city",
+    "VE": "venezuela",
+    "VN": "vietnam",
+    "WF": "wallis and futuna",
+    "EH": "western sahara",
+    "YE": "yemen",
+    "ZM": "zambia",
+    "ZW": "zimbabwe",
+}
+
+# common names people type that aren't the API's names
+location_aliases = {
+    "global": "international",
+    "world": "international",
+    "worldwide": "international",
+    "usa": "united states",
+    "america": "united states",
+    "united states of america": "united states",
+    "uk": "united kingdom",
+    "britain": "united kingdom",
+    "great britain": "united kingdom",
+    "england": "united kingdom",
+    "scotland": "united kingdom",
+    "wales": "united kingdom",
+    "northern ireland": "united kingdom",
+    "uae": "united arab emirates",
+    "emirates": "united arab emirates",
+    "drc": "congo (drc)",
+    "dr congo": "congo (drc)",
+    "democratic republic of the congo": "congo (drc)",
+    "republic of the congo": "congo (republic)",
+    "ivory coast": "côte d’ivoire",
+    "czechia": "czech republic",
+    "north macedonia": "macedonia (fyrom)",
+    "burma": "myanmar (burma)",
+    "eswatini": "swaziland",
+    "holland": "netherlands",
+    "korea": "south korea",
+    "republic of korea": "south korea",
+    "vatican": "vatican city",
+    "holy see": "vatican city",
+    "cabo verde": "cape verde",
+    "east timor": "timor-leste",
+    "persia": "iran",
+    "turkiye": "turkey",
+    "türkiye": "turkey",
+    "russian federation": "russia",
+    "viet nam": "vietnam",
+    "brunei darussalam": "brunei",
+    "lao": "laos",
+    "saint vincent and the grenadines": "st. vincent & grenadines",
+    "heard island and mcdonald islands": "heard & mcdonald islands",
+    "falklands": "falkland islands",
+}
+
 cr_locations = ", ".join(k for k in locations.keys())
 cr_locations_embed = discord.Embed(
     title="Clash Royale location list", description=cr_locations